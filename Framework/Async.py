@@ -0,0 +1,111 @@
+# Copyright (c) Geoffrey Lentner 2015. All Rights Reserved.
+# See LICENSE (GPLv3)
+# slipy/Framework/Async.py
+"""
+asyncio support for the archive query modules (Simbad, Mast).
+
+Queries are awaited on the running event loop while the request itself is
+carried out by the shared `Transport` on a bounded pool of worker threads.
+At most `SetConcurrency(limit)` queries are in flight at once; any further
+ones wait their turn without blocking the loop. Since the synchronous
+functions do the work, results are identical on both paths, except that
+generators (e.g., streamed searches) come back as async iterators whose
+items are also read on the executor.
+"""
+
+import asyncio
+import threading
+from types import GeneratorType
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from .. import SlipyError
+from .Transport import GetTransport
+
+class AsyncError(SlipyError):
+	"""
+	Exception specific to the Async module.
+	"""
+	pass
+
+# executor shared by every awaited query
+_executor = None
+_limit    = 64
+_lock     = threading.Lock()
+
+def GetExecutor():
+	"""
+	Return the shared executor (created on first use).
+	"""
+	global _executor
+
+	with _lock:
+		if _executor is None:
+			_executor = ThreadPoolExecutor(max_workers=_limit,
+				thread_name_prefix='slipy-query')
+
+			# as many idle connections as queries in flight, so that they
+			# are reused rather than opened and dropped
+			transport = GetTransport()
+			if getattr(transport, 'pool_size', _limit) < _limit:
+				transport.resize(_limit)
+		return _executor
+
+def SetConcurrency(limit):
+	"""
+	Set the maximum number of queries in flight at once. The shared
+	`Transport` is resized to keep as many idle connections per host
+	(`pool_size`); a transport given to queries should be created with
+	`pool_size=limit` for its connections to be reused.
+	"""
+	global _executor, _limit
+
+	if type(limit) is not int or limit < 1:
+		raise AsyncError('SetConcurrency expects a positive integer.')
+
+	with _lock:
+		executor, _executor, _limit = _executor, None, limit
+
+	if executor is not None:
+		# queries already submitted are allowed to complete
+		executor.shutdown(wait=False)
+
+# end of an iterator pulled by `Iterate`
+_done = object()
+
+async def Iterate(iterator):
+	"""
+	Async iterator over the items of `iterator`, each one pulled on the
+	shared executor so that the reads behind it do not block the loop.
+	"""
+	loop   = asyncio.get_running_loop()
+	future = None
+	try:
+		while True:
+			future = GetExecutor().submit(next, iterator, _done)
+			item   = await asyncio.wrap_future(future)
+			if item is _done:
+				return
+			yield item
+
+	finally:
+		# a generator abandoned midway releases its connection on close
+		if isinstance(iterator, GeneratorType):
+			if future is not None and not future.done():
+				# cancelled while `next` runs on the executor: the generator
+				# can only be closed once it has returned
+				future.add_done_callback(lambda future: iterator.close())
+			else:
+				await loop.run_in_executor(GetExecutor(), iterator.close)
+
+async def Run(function, *args, **kwargs):
+	"""
+	Await `function(*args, **kwargs)` on the shared executor. A generator
+	returned by it is handed back as an async iterator (see `Iterate`).
+	"""
+	loop   = asyncio.get_running_loop()
+	result = await loop.run_in_executor(GetExecutor(),
+		partial(function, *args, **kwargs))
+	if isinstance(result, GeneratorType):
+		return Iterate(result)
+	return result
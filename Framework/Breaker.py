@@ -0,0 +1,186 @@
+# Copyright (c) Geoffrey Lentner 2015. All Rights Reserved.
+# See LICENSE (GPLv3)
+# slipy/Framework/Breaker.py
+"""
+Per-host circuit breaker for the archive query modules (Simbad, Mast).
+
+A `Breaker` given to a `Transport` opens the circuit to a host after
+`threshold` consecutive failures (network errors, HTTP 5xx; a request
+that merely runs out of its own deadline does not count). While it is
+open, requests to that host fail at once instead of waiting out their
+timeouts. After `cooldown` seconds it is half-open: up to `probes`
+requests go through, and the first result closes or re-opens it. With
+`fallback` set, the transport answers from its cache, however stale, while
+the circuit is open.
+"""
+
+import time
+import threading
+
+from .. import SlipyError
+from .Options import Options, OptionsError
+
+class BreakerError(SlipyError):
+	"""
+	Exception specific to the Breaker module.
+	"""
+	pass
+
+class Circuit:
+	"""
+	State of the circuit to a single host: 'closed', 'open' or 'half-open'.
+	"""
+	def __init__(self, threshold, cooldown, probes):
+		self.threshold = threshold
+		self.cooldown  = cooldown
+		self.probes    = probes
+
+		self.state     = 'closed'
+		self.failures  = 0 # consecutive
+		self.opened    = 0
+		self.probing   = 0
+		self.lock      = threading.Lock()
+
+	def allow(self):
+		"""
+		True if a request may be sent.
+		"""
+		with self.lock:
+			if self.state == 'closed':
+				return True
+
+			if self.state == 'open':
+				if time.monotonic() - self.opened < self.cooldown:
+					return False
+				self.state   = 'half-open'
+				self.probing = 0
+
+			if self.probing < self.probes:
+				self.probing += 1
+				return True
+			return False
+
+	def success(self):
+		"""
+		Report a request that reached the host.
+		"""
+		with self.lock:
+			self.state    = 'closed'
+			self.failures = 0
+			self.probing  = 0
+
+	def failure(self):
+		"""
+		Report a request that failed.
+		"""
+		with self.lock:
+			self.failures += 1
+			if self.state == 'half-open' or self.failures >= self.threshold:
+				self.state   = 'open'
+				self.opened  = time.monotonic()
+				self.probing = 0
+
+	def cancel(self):
+		"""
+		Report a request that was let through but ended without reaching a
+		verdict on the host (e.g., it ran out of its deadline first).
+		"""
+		with self.lock:
+			if self.state == 'half-open' and self.probing > 0:
+				self.probing -= 1
+
+	def is_open(self):
+		"""
+		True unless requests are flowing normally.
+		"""
+		with self.lock:
+			return self.state != 'closed'
+
+class Breaker:
+	"""
+	Circuit breaker per host, shared by every query made through the
+	`Transport` it is given to.
+
+	kwargs = {
+		'threshold' : 5,    # consecutive failures opening the circuit
+		'cooldown'  : 30.0, # seconds before probing again
+		'probes'    : 1,    # requests let through when half-open
+		'fallback'  : True  # serve stale cache entries while open
+	}
+	"""
+	def __init__(self, **kwargs):
+		try:
+			# available keyword options
+			self.options = Options( kwargs,
+				{
+					'threshold' : 5,
+					'cooldown'  : 30.0,
+					'probes'    : 1,
+					'fallback'  : True
+				})
+
+			# give assignments
+			self.threshold = self.options('threshold')
+			self.cooldown  = self.options('cooldown')
+			self.probes    = self.options('probes')
+			self.fallback  = self.options('fallback')
+
+		except OptionsError as err:
+			print( '\n --> OptionsError:', err.msg )
+			raise BreakerError('Failed to initialize Breaker.')
+
+		if self.threshold < 1 or self.probes < 1:
+			raise BreakerError('`threshold` and `probes` must be positive.')
+
+		self.circuits = {}
+		self.lock     = threading.Lock()
+
+	def circuit(self, hostname):
+		"""
+		The `Circuit` to `hostname` (created on first use).
+		"""
+		with self.lock:
+			if hostname not in self.circuits:
+				self.circuits[hostname] = Circuit(self.threshold,
+					self.cooldown, self.probes)
+			return self.circuits[hostname]
+
+	def allow(self, hostname):
+		"""
+		True if a request to `hostname` may be sent.
+		"""
+		return self.circuit(hostname).allow()
+
+	def success(self, hostname):
+		"""
+		Report a request that reached `hostname`.
+		"""
+		self.circuit(hostname).success()
+
+	def failure(self, hostname):
+		"""
+		Report a request to `hostname` that failed.
+		"""
+		self.circuit(hostname).failure()
+
+	def cancel(self, hostname):
+		"""
+		Report a request to `hostname` that ended without reaching a verdict.
+		"""
+		self.circuit(hostname).cancel()
+
+	def is_open(self, hostname):
+		"""
+		True if the circuit to `hostname` is open or half-open.
+		"""
+		return self.circuit(hostname).is_open()
+
+	def state(self):
+		"""
+		Current state of every host seen, for monitoring.
+		"""
+		with self.lock:
+			circuits = dict(self.circuits)
+		return { hostname: { 'state': circuit.state,
+			'failures': circuit.failures } for hostname, circuit
+			in circuits.items() }
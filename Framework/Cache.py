@@ -0,0 +1,247 @@
+# Copyright (c) Geoffrey Lentner 2015. All Rights Reserved.
+# See LICENSE (GPLv3)
+# slipy/Framework/Cache.py
+"""
+Persistent (SQLite) cache of raw archive responses.
+
+A `Cache` given to a `Transport` stores the body of every successful
+request, keyed on the normalized request (URL plus POST body), before any
+parsing takes place. Entries expire after a time-to-live that can be set
+per endpoint, and the least recently used entries are evicted beyond
+`max_size` bytes. Negative answers (an identifier SIMBAD cannot resolve,
+a search without rows) are kept for the shorter `negative_ttl`. Within
+`grace` seconds after expiry an entry may still be served while the
+transport refreshes it in the background (stale-while-revalidate). The
+same file may be shared by several processes.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+from .. import SlipyError
+from .Options import Options, OptionsError
+
+class CacheError(SlipyError):
+	"""
+	Exception specific to the Cache module.
+	"""
+	pass
+
+def Normalize(url, data=None):
+	"""
+	Normalized form of a request: lower case scheme and host, query
+	parameters in sorted order, followed by the POST body (if any).
+	"""
+	parts = urlsplit(url)
+	query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+	url   = '{}://{}{}?{}'.format(parts.scheme.lower(), parts.netloc.lower(),
+		parts.path, query)
+
+	if data is None:
+		return 'GET ' + url
+
+	if type(data) is bytes:
+		data = data.decode('utf-8')
+	return 'POST ' + url + '\n' + data
+
+class Cache:
+	"""
+	SQLite backed cache of raw responses with per-endpoint time-to-live
+	and least recently used eviction.
+
+	kwargs = {
+		'path'     : '~/.slipy/queries.sqlite', # database file
+		'ttl'      : 86400.0,                   # default time-to-live (s)
+		'ttls'     : {},                        # endpoint -> time-to-live
+		'negative_ttl' : 3600.0,                # for negative answers (s)
+		'grace'    : 0.0,                       # stale entries served (s)
+		'max_size' : 256 * 1024**2              # bytes kept at most
+	}
+
+	Keys of `ttls` are endpoints such as 'simbad.u-strasbg.fr' or
+	'archive.stsci.edu/hst'; the longest one matching the host and path
+	of a request applies.
+	"""
+	def __init__(self, **kwargs):
+		try:
+			# available keyword options
+			self.options = Options( kwargs,
+				{
+					'path'     : os.path.join('~', '.slipy', 'queries.sqlite'),
+					'ttl'      : 86400.0,
+					'ttls'     : {},
+					'negative_ttl' : 3600.0,
+					'grace'    : 0.0,
+					'max_size' : 256 * 1024**2
+				})
+
+			# give assignments
+			self.path     = os.path.expanduser(self.options('path'))
+			self.ttl      = self.options('ttl')
+			self.ttls     = self.options('ttls')
+			self.negative_ttl = self.options('negative_ttl')
+			self.grace    = self.options('grace')
+			self.max_size = self.options('max_size')
+
+		except OptionsError as err:
+			print( '\n --> OptionsError:', err.msg )
+			raise CacheError('Failed to initialize Cache.')
+
+		try:
+			directory = os.path.dirname(self.path)
+			if directory and not os.path.isdir(directory):
+				os.makedirs(directory)
+
+			self.lock = threading.Lock()
+			self.db   = sqlite3.connect(self.path, timeout=30,
+				check_same_thread=False)
+			# REPLACE fires the delete trigger below only with this set
+			self.db.execute('PRAGMA recursive_triggers = ON')
+			with self.db:
+				self.db.execute('CREATE TABLE IF NOT EXISTS responses ('
+					'key TEXT PRIMARY KEY, url TEXT, body BLOB, '
+					'stored REAL, expires REAL, accessed REAL, size INTEGER, '
+					'negative INTEGER DEFAULT 0)')
+				self.db.execute('CREATE INDEX IF NOT EXISTS lru '
+					'ON responses (accessed)')
+
+				# files written before negative entries existed
+				columns = [ row[1] for row in
+					self.db.execute('PRAGMA table_info(responses)') ]
+				if 'negative' not in columns:
+					self.db.execute('ALTER TABLE responses '
+						'ADD COLUMN negative INTEGER DEFAULT 0')
+
+				# total size of the bodies, kept by triggers in the same
+				# transaction as every write (counted once for older files)
+				self.db.execute('CREATE TABLE IF NOT EXISTS usage ('
+					'id INTEGER PRIMARY KEY, total INTEGER)')
+				self.db.execute('INSERT OR IGNORE INTO usage (id, total) '
+					'SELECT 0, COALESCE(SUM(size), 0) FROM responses')
+				self.db.execute('CREATE TRIGGER IF NOT EXISTS usage_insert '
+					'AFTER INSERT ON responses BEGIN UPDATE usage SET '
+					'total = total + NEW.size WHERE id = 0; END')
+				self.db.execute('CREATE TRIGGER IF NOT EXISTS usage_delete '
+					'AFTER DELETE ON responses BEGIN UPDATE usage SET '
+					'total = total - OLD.size WHERE id = 0; END')
+				self.db.execute('CREATE TRIGGER IF NOT EXISTS usage_update '
+					'AFTER UPDATE OF size ON responses BEGIN UPDATE usage SET '
+					'total = total + NEW.size - OLD.size WHERE id = 0; END')
+
+		except (OSError, sqlite3.Error) as err:
+			raise CacheError('Failed to open cache at `{}`: {}'
+				.format(self.path, err))
+
+	def lifetime(self, url):
+		"""
+		Time-to-live for a request to `url`.
+		"""
+		parts    = urlsplit(url)
+		endpoint = parts.netloc.lower() + parts.path
+		matches  = [ key for key in self.ttls if endpoint.startswith(key) ]
+
+		if not matches:
+			return self.ttl
+		return self.ttls[ max(matches, key=len) ]
+
+	def get(self, url, data=None):
+		"""
+		Cached body (bytes) for the request, or None if it is missing or
+		has expired.
+		"""
+		entry = self.lookup(url, data)
+		if entry is None or entry[1] < time.time():
+			return None
+		return entry[0]
+
+	def lookup(self, url, data=None, stale=None):
+		"""
+		Cached (body, expires) for the request, or None if it is missing or
+		expired more than `stale` seconds ago (`grace` by default).
+		"""
+		key = hashlib.sha256(Normalize(url, data).encode('utf-8')).hexdigest()
+		now = time.time()
+		stale = self.grace if stale is None else stale
+
+		with self.lock, self.db:
+			row = self.db.execute('SELECT body, expires FROM responses '
+				'WHERE key = ?', (key,)).fetchone()
+			if row is None or row[1] + stale < now:
+				return None
+
+			self.db.execute('UPDATE responses SET accessed = ? WHERE key = ?',
+				(now, key))
+			return bytes(row[0]), row[1]
+
+	def put(self, url, data, body, negative=False):
+		"""
+		Store `body` (bytes) for the request. A `negative` answer expires
+		after `negative_ttl` instead of the endpoint's time-to-live.
+		"""
+		key = hashlib.sha256(Normalize(url, data).encode('utf-8')).hexdigest()
+		now = time.time()
+		ttl = self.negative_ttl if negative else self.lifetime(url)
+
+		with self.lock, self.db:
+			self.db.execute('INSERT OR REPLACE INTO responses (key, url, body, '
+				'stored, expires, accessed, size, negative) VALUES '
+				'(?, ?, ?, ?, ?, ?, ?, ?)', (key, url, sqlite3.Binary(body), now,
+				now + ttl, now, len(body), int(negative)))
+			self.__evict()
+
+	def forget(self, url, data=None):
+		"""
+		Delete the entry for the request (if any).
+		"""
+		key = hashlib.sha256(Normalize(url, data).encode('utf-8')).hexdigest()
+
+		with self.lock, self.db:
+			self.db.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+	def __evict(self):
+		"""
+		Delete least recently used entries beyond `max_size` bytes. The
+		entries are only scanned once the running total exceeds it.
+		"""
+		total, = self.db.execute('SELECT total FROM usage WHERE id = 0'
+			).fetchone()
+		if total <= self.max_size:
+			return
+
+		doomed = []
+		for key, size in self.db.execute('SELECT key, size FROM responses '
+			'ORDER BY accessed'):
+			if total <= self.max_size:
+				break
+			doomed.append((key,))
+			total -= size
+
+		self.db.executemany('DELETE FROM responses WHERE key = ?', doomed)
+
+	def purge(self, expired=True, negative=False):
+		"""
+		Delete expired entries (or every entry if `expired` is False).
+		With `negative` True, delete every negative entry instead.
+		Returns the number of entries deleted.
+		"""
+		with self.lock, self.db:
+			if negative:
+				cursor = self.db.execute('DELETE FROM responses '
+					'WHERE negative = 1')
+			elif expired:
+				cursor = self.db.execute('DELETE FROM responses '
+					'WHERE expires < ?', (time.time(),))
+			else:
+				cursor = self.db.execute('DELETE FROM responses')
+			return cursor.rowcount
+
+	def close(self):
+		"""
+		Close the database.
+		"""
+		with self.lock:
+			self.db.close()
@@ -0,0 +1,208 @@
+# Copyright (c) Geoffrey Lentner 2015. All Rights Reserved.
+# See LICENSE (GPLv3)
+# slipy/Framework/Governor.py
+"""
+Per-host rate governor for the archive query modules (Simbad, Mast).
+
+A `Governor` given to a `Transport` paces the requests to each host with
+a token bucket (`rate` requests per second, up to `burst` at once) and
+bounds the requests in flight with an additive-increase/multiplicative-
+decrease (AIMD) limit. The limit grows while responses come back quickly
+and is cut by `decrease` on slow responses (beyond `latency` seconds),
+HTTP 429/503 answers and timeouts. A request is in flight, and its
+latency measured, until the response headers arrive; reading the body is
+left out, as the caller may be the one pacing it.
+"""
+
+import time
+import threading
+
+from .. import SlipyError
+from .Options import Options, OptionsError
+
+class GovernorError(SlipyError):
+	"""
+	Exception specific to the Governor module.
+	"""
+	pass
+
+class Host:
+	"""
+	Token bucket and concurrency limit for a single host.
+	"""
+	def __init__(self, rate, burst, limit, min_limit, max_limit, latency,
+		decrease):
+		self.rate      = float(rate)
+		self.burst     = float(burst)
+		self.limit     = float(limit)
+		self.min_limit = float(min_limit)
+		self.max_limit = float(max_limit)
+		self.latency   = float(latency)
+		self.decrease  = float(decrease)
+
+		self.tokens    = self.burst
+		self.refilled  = time.monotonic()
+		self.in_flight = 0
+		self.throttled = 0 # congestion signals seen
+		self.condition = threading.Condition()
+
+	def acquire(self, deadline=None):
+		"""
+		Block until a token and a slot under the limit are available.
+		Returns False (without either) if they would not be by `deadline`
+		(a `time.monotonic` time, or None to wait as long as it takes).
+		"""
+		with self.condition:
+			while True:
+				now = time.monotonic()
+				if deadline is not None and now >= deadline:
+					return False
+
+				if self.in_flight >= max(1, int(self.limit)):
+					self.condition.wait(None if deadline is None
+						else deadline - now)
+					continue
+
+				self.tokens   = min(self.burst,
+					self.tokens + (now - self.refilled) * self.rate)
+				self.refilled = now
+				if self.tokens >= 1:
+					break
+
+				delay = (1 - self.tokens) / self.rate
+				if deadline is not None and now + delay > deadline:
+					return False
+				self.condition.wait(delay)
+
+			self.tokens    -= 1
+			self.in_flight += 1
+			return True
+
+	def cancel(self):
+		"""
+		Free the slot of a request that was not sent, leaving the limit.
+		"""
+		with self.condition:
+			self.in_flight -= 1
+			self.condition.notify_all()
+
+	def release(self, latency, congested):
+		"""
+		Free the slot of a finished request and adapt the limit.
+		"""
+		with self.condition:
+			self.in_flight -= 1
+			if congested or latency > self.latency:
+				self.throttled += 1
+				self.limit = max(self.min_limit, self.limit * self.decrease)
+			else:
+				self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+			self.condition.notify_all()
+
+	def state(self):
+		"""
+		Current settings and counters.
+		"""
+		with self.condition:
+			return {
+				'rate'      : self.rate,
+				'tokens'    : self.tokens,
+				'limit'     : self.limit,
+				'in_flight' : self.in_flight,
+				'throttled' : self.throttled
+			}
+
+class Governor:
+	"""
+	Token bucket and AIMD concurrency limit per host, shared by every
+	query made through the `Transport` it is given to.
+
+	kwargs = {
+		'rate'      : 5.0,  # requests per second
+		'burst'     : 5,    # requests sent at once after a pause
+		'limit'     : 4,    # initial requests in flight
+		'min_limit' : 1,    # ... at least
+		'max_limit' : 32,   # ... at most
+		'latency'   : 10.0, # responses slower than this are congestion (s)
+		'decrease'  : 0.5,  # factor on the limit after congestion
+		'hosts'     : {}    # hostname -> dictionary of the options above
+	}
+	"""
+	def __init__(self, **kwargs):
+		try:
+			# available keyword options
+			self.options = Options( kwargs,
+				{
+					'rate'      : 5.0,
+					'burst'     : 5,
+					'limit'     : 4,
+					'min_limit' : 1,
+					'max_limit' : 32,
+					'latency'   : 10.0,
+					'decrease'  : 0.5,
+					'hosts'     : {}
+				})
+
+			# settings for hosts without their own
+			self.defaults = { name: value for name, value
+				in self.options.items() if name != 'hosts' }
+			self.settings = self.options('hosts')
+
+		except OptionsError as err:
+			print( '\n --> OptionsError:', err.msg )
+			raise GovernorError('Failed to initialize Governor.')
+
+		for host, settings in self.settings.items():
+			unknown = set(settings) - set(self.defaults)
+			if unknown:
+				raise GovernorError('Unknown settings for `{}`: {}'
+					.format(host, ', '.join(unknown)))
+
+		self.hosts = {}
+		self.lock  = threading.Lock()
+
+	def host(self, hostname):
+		"""
+		The `Host` governing `hostname` (created on first use).
+		"""
+		with self.lock:
+			if hostname not in self.hosts:
+				settings = dict(self.defaults, **self.settings.get(hostname, {}))
+				if settings['rate'] <= 0 or settings['decrease'] >= 1:
+					raise GovernorError('`rate` must be positive and '
+						'`decrease` less than one.')
+				self.hosts[hostname] = Host(**settings)
+			return self.hosts[hostname]
+
+	def acquire(self, hostname, deadline=None):
+		"""
+		Block until a request to `hostname` may be sent. Returns the time
+		to hand back to `release`, or None if the request could not be sent
+		by `deadline` (see `Framework.Transport.Deadline`).
+		"""
+		if not self.host(hostname).acquire(deadline):
+			return None
+		return time.monotonic()
+
+	def cancel(self, hostname):
+		"""
+		Give back what `acquire` took for a request that was not sent.
+		"""
+		self.host(hostname).cancel()
+
+	def release(self, hostname, started, status=None, error=None):
+		"""
+		Report a finished request to `hostname`: its HTTP `status`, or
+		the `error` it failed with.
+		"""
+		latency   = time.monotonic() - started
+		congested = status in (429, 503) or isinstance(error, TimeoutError)
+		self.host(hostname).release(latency, congested)
+
+	def state(self):
+		"""
+		Current state of every host seen, for monitoring.
+		"""
+		with self.lock:
+			hosts = dict(self.hosts)
+		return { hostname: host.state() for hostname, host in hosts.items() }
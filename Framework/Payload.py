@@ -0,0 +1,81 @@
+# Copyright (c) Geoffrey Lentner 2015. All Rights Reserved.
+# See LICENSE (GPLv3)
+# slipy/Framework/Payload.py
+"""
+In-place parsing of raw archive responses (Simbad, Mast).
+
+A `Payload` locates the sections of a return file on the bytes the
+transport handed back, without copying them: the surrounding whitespace,
+the head (where the archives report errors) and the start of the data.
+Only the part that is used is then decoded, straight from the buffer.
+"""
+
+from .. import SlipyError
+
+class PayloadError(SlipyError):
+	"""
+	Exception specific to the Payload module.
+	"""
+	pass
+
+WHITESPACE = b' \t\n\r\x0b\x0c'
+
+def Bounds(body, start=0, end=None):
+	"""
+	(start, end) of `body` (bytes) between `start` and `end` without the
+	surrounding whitespace, as `bytes.strip` would leave it.
+	"""
+	end = len(body) if end is None else end
+	while start < end and body[start] in WHITESPACE:
+		start += 1
+	while end > start and body[end - 1] in WHITESPACE:
+		end -= 1
+	return start, end
+
+class Payload:
+	"""
+	Payload( body, marker=b'data', heads=(), lines=None, parse=True ):
+
+	Sections of the return file `body` (bytes). The data starts after the
+	last `marker` (if `parse` is set, else at the start). The head ends at
+	the first of `heads` found, after `lines` lines, or else at the data.
+	"""
+	def __init__(self, body, marker=b'data', heads=(), lines=None,
+		parse=True):
+		if not isinstance(body, (bytes, bytearray)):
+			raise PayloadError('Payload expects the bytes of a response.')
+
+		self.body = body
+		self.start, self.end = Bounds(body)
+
+		boundary  = body.rfind(marker, self.start, self.end) if parse else -1
+		self.data = self.start if boundary < 0 else boundary + len(marker)
+
+		found = [ index for index in (body.find(head, self.start, self.end)
+			for head in heads) if index >= 0 ]
+		if lines is not None:
+			index = self.start
+			for line in range(lines):
+				index = body.find(b'\n', index, self.end)
+				if index < 0:
+					index = self.end
+					break
+				index += 1
+			found.append(index)
+		if not found and boundary >= 0:
+			found.append(boundary)
+		self.head = min(found) if found else self.end
+
+	def reports(self, *needles):
+		"""
+		True if any of `needles` (bytes) is found in the head.
+		"""
+		return any( self.body.find(needle, self.start, self.head) >= 0
+			for needle in needles )
+
+	def text(self, whole=False):
+		"""
+		The data (or with `whole` set, the stripped body) decoded as UTF-8.
+		"""
+		start = self.start if whole else self.data
+		return str(memoryview(self.body)[start:self.end], 'utf-8')
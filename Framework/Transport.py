@@ -0,0 +1,840 @@
+# Copyright (c) Geoffrey Lentner 2015. All Rights Reserved.
+# See LICENSE (GPLv3)
+# slipy/Framework/Transport.py
+"""
+Shared HTTP transport for the archive query modules (Simbad, Mast).
+
+A `Transport` keeps a pool of persistent HTTP/1.1 connections per host so
+successive queries skip the DNS, TCP and TLS handshakes. One transport is
+shared by default (see `GetTransport`/`SetTransport`); query classes also
+accept a `transport` keyword argument. A transport given a `cache`
+(see `Framework.Cache`) answers repeated requests from it; entries within
+the `grace` period of the cache are served stale while up to `refreshers`
+background threads fetch them again. Concurrent identical requests are
+sent only once (see `SingleFlight`). A transport given a `governor`
+(see `Framework.Governor`) paces the requests to each host, and one
+given a `breaker` (see `Framework.Breaker`) fails fast while a host is
+down, answering from the cache (marked stale) where it can.
+
+Every request has a socket `timeout` and may be given a `deadline` (see
+`Deadline`). Failed requests and HTTP 429/5xx answers are retried with
+jittered exponential backoff; archive queries are read-only, so this is
+safe. With `hedge` set, a request still unanswered after the 95th
+percentile of recent latencies to its host is sent a second time and the
+first answer wins. Requests that change state on the server (creating or
+deleting a TAP job) go through `Transport.submit` instead, which sends
+them exactly once, on a fresh connection, without the cache or sharing.
+
+Responses are requested gzip/deflate compressed (`compress`) and
+decompressed incrementally while being read, `chunk_size` bytes at a time,
+so the compressed body is never held whole. `Transport.stream` hands the
+decoded chunks to the caller as they arrive.
+"""
+
+import time
+import zlib
+import random
+import threading
+from collections import deque
+from queue import LifoQueue, Empty, Full
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from urllib.parse import urlsplit, urljoin
+from urllib.error import URLError, HTTPError
+
+from .. import SlipyError
+from .Options import Options, OptionsError
+from .Cache import Normalize
+from .Breaker import BreakerError
+
+class TransportError(SlipyError):
+	"""
+	Exception specific to the Transport module.
+	"""
+	pass
+
+class DeadlineExceeded(TimeoutError):
+	"""
+	A request ran out of its `Deadline` on the client side (waiting for
+	the governor, another caller or a hedge), not a failure of the host.
+	"""
+	pass
+
+# HTTP answers worth another attempt
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# streamed bodies larger than this are not stored in the cache, so that
+# streaming stays within constant memory
+STREAM_CACHE_LIMIT = 16 * 1024**2
+
+def Deadline(seconds):
+	"""
+	Deadline `seconds` from now, as given to `Transport.request` (None if
+	`seconds` is not positive, i.e., no deadline).
+	"""
+	if not seconds or seconds <= 0:
+		return None
+	return time.monotonic() + seconds
+
+class Response:
+	"""
+	The result of `Transport.request`. Like the object returned by
+	`urllib.request.urlopen`, the body is retrieved with `read()`.
+	`cached` is True if the body came from the cache, `stale` if that
+	entry had already expired.
+	"""
+	def __init__(self, url, status, headers, data, cached=False, stale=False):
+		self.url     = url
+		self.status  = status
+		self.headers = headers
+		self.data    = data
+		self.cached  = cached
+		self.stale   = stale
+
+	def read(self):
+		"""
+		Retrieve the body of the response (bytes).
+		"""
+		return self.data
+
+class Decoder:
+	"""
+	Incremental decoder for a `Content-Encoding` (gzip, deflate or none).
+	"""
+	def __init__(self, encoding):
+		encoding = (encoding or 'identity').strip().lower()
+		if encoding in ('gzip', 'x-gzip'):
+			self.decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+		elif encoding == 'deflate':
+			self.decoder = zlib.decompressobj()
+		elif encoding == 'identity':
+			self.decoder = None
+		else:
+			raise URLError('unsupported content encoding `{}`'.format(encoding))
+		self.deflate = encoding == 'deflate'
+		self.started = False
+
+	def decompress(self, chunk):
+		"""
+		Decoded bytes for the next `chunk` of the body.
+		"""
+		if self.decoder is None:
+			return chunk
+
+		if self.deflate and not self.started:
+			# some servers send raw deflate streams without the zlib header
+			self.started = True
+			try:
+				return self.decoder.decompress(chunk)
+			except zlib.error:
+				self.decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+
+		return self.decoder.decompress(chunk)
+
+	def flush(self):
+		"""
+		Decoded bytes still buffered at the end of the body.
+		"""
+		return b'' if self.decoder is None else self.decoder.flush()
+
+class SingleFlight:
+	"""
+	Concurrent calls for the same key share one execution: the first caller
+	runs the function, the others wait for it and receive its result (or
+	have its exception raised).
+	"""
+	def __init__(self):
+		self.calls = {}
+		self.lock  = threading.Lock()
+
+	def do(self, key, function, deadline=None):
+		"""
+		Return `function()`, or the result of the call already in flight
+		for `key`. Waiting on another call stops at `deadline` (see
+		`Deadline`) with a `URLError`.
+		"""
+		with self.lock:
+			call   = self.calls.get(key)
+			leader = call is None
+			if leader:
+				call = self.calls[key] = { 'done': threading.Event() }
+
+		if not leader:
+			timeout = None if deadline is None else max(0,
+				deadline - time.monotonic())
+			if not call['done'].wait(timeout):
+				raise URLError(DeadlineExceeded('deadline exceeded'))
+			if 'error' in call:
+				raise call['error']
+			return call['result']
+
+		try:
+			call['result'] = function()
+			return call['result']
+
+		except Exception as err:
+			call['error'] = err
+			raise
+
+		finally:
+			with self.lock:
+				del self.calls[key]
+			call['done'].set()
+
+class Transport:
+	"""
+	HTTP/1.1 transport with a pool of persistent connections per host.
+	Safe to share across threads.
+
+	kwargs = {
+		'pool_size'  : 4,    # idle connections kept per host
+		'redirects'  : 5,    # redirects followed per request
+		'share'      : True, # identical concurrent requests sent once
+		'refreshers' : 2,    # background refreshes of stale entries
+		'timeout'    : 30.0, # socket timeout (s)
+		'retries'    : 2,    # further attempts after a failure
+		'backoff'    : 0.5,  # first delay between attempts (s), doubling
+		'max_backoff': 8.0,  # longest delay between attempts (s)
+		'hedge'      : False,# duplicate requests slower than usual
+		'compress'   : True, # ask for gzip/deflate compressed responses
+		'chunk_size' : 65536,# bytes read (and decompressed) at a time
+		'cache'      : None, # `Framework.Cache` for responses
+		'governor'   : None, # `Framework.Governor` pacing requests
+		'breaker'    : None  # `Framework.Breaker` for unavailable hosts
+	}
+	"""
+	def __init__(self, **kwargs):
+		# not `Options` keywords
+		self.cache    = kwargs.pop('cache', None)
+		self.governor = kwargs.pop('governor', None)
+		self.breaker  = kwargs.pop('breaker', None)
+
+		try:
+			# available keyword options
+			self.options = Options( kwargs,
+				{
+					'pool_size'  : 4,
+					'redirects'  : 5,
+					'share'      : True,
+					'refreshers' : 2,
+					'timeout'    : 30.0,
+					'retries'    : 2,
+					'backoff'    : 0.5,
+					'max_backoff': 8.0,
+					'hedge'      : False,
+					'compress'   : True,
+					'chunk_size' : 65536
+				})
+
+			# give assignments
+			self.pool_size  = self.options('pool_size')
+			self.redirects  = self.options('redirects')
+			self.share      = self.options('share')
+			self.refreshers = self.options('refreshers')
+			self.timeout    = self.options('timeout')
+			self.retries    = self.options('retries')
+			self.backoff    = self.options('backoff')
+			self.max_backoff = self.options('max_backoff')
+			self.hedge      = self.options('hedge')
+			self.compress   = self.options('compress')
+			self.chunk_size = self.options('chunk_size')
+
+		except OptionsError as err:
+			print( '\n --> OptionsError:', err.msg )
+			raise TransportError('Failed to initialize Transport.')
+
+		if self.pool_size < 1 or self.chunk_size < 1:
+			raise TransportError('`pool_size` and `chunk_size` must be '
+				'positive integers.')
+
+		self.pools   = {}
+		self.lock    = threading.Lock()
+		self.flights = SingleFlight()
+
+		# stale entries being refreshed in the background
+		self.refreshing = set()
+		self.refresher  = None
+
+		# recent latencies per hostname and threads for hedged requests
+		self.latencies = {}
+		self.hedger    = None
+
+	def __pool(self, host):
+		"""
+		Idle connections for `host`, a (scheme, hostname, port) tuple.
+		"""
+		with self.lock:
+			if host not in self.pools:
+				self.pools[host] = LifoQueue(self.pool_size)
+			return self.pools[host]
+
+	def __acquire(self, host, timeout, fresh=False):
+		"""
+		Take an idle connection to `host` or open a new one (always, if
+		`fresh` is set).
+		"""
+		try:
+			if fresh:
+				raise Empty
+			connection = self.__pool(host).get_nowait()
+			connection.timeout = timeout
+			if connection.sock is not None:
+				connection.sock.settimeout(timeout)
+			return connection
+
+		except Empty:
+			scheme, hostname, port = host
+			if scheme == 'https':
+				return HTTPSConnection(hostname, port, timeout=timeout)
+			return HTTPConnection(hostname, port, timeout=timeout)
+
+	def __release(self, host, connection):
+		"""
+		Return `connection` to the pool for `host` (closed if it is full).
+		"""
+		try:
+			self.__pool(host).put_nowait(connection)
+		except Full:
+			connection.close()
+
+	def resize(self, pool_size):
+		"""
+		Keep up to `pool_size` idle connections per host from now on (e.g.,
+		as many as queries run at once, see `Framework.Async`).
+		"""
+		if type(pool_size) is not int or pool_size < 1:
+			raise TransportError('`pool_size` must be a positive integer.')
+
+		with self.lock:
+			self.pool_size = pool_size
+			pools, self.pools = self.pools, {}
+
+		# idle connections move to the new pools (the extra ones are closed)
+		for host, pool in pools.items():
+			while True:
+				try:
+					self.__release(host, pool.get_nowait())
+				except Empty:
+					break
+
+	def __timeout(self, deadline):
+		"""
+		Socket timeout for a request that must be done by `deadline`.
+		"""
+		if deadline is None:
+			return self.timeout
+
+		remaining = deadline - time.monotonic()
+		if remaining <= 0:
+			raise URLError(DeadlineExceeded('deadline exceeded'))
+		return min(self.timeout, remaining)
+
+	def __record(self, hostname, latency):
+		"""
+		Keep `latency` among the recent ones for `hostname`.
+		"""
+		with self.lock:
+			if hostname not in self.latencies:
+				self.latencies[hostname] = deque(maxlen=200)
+			self.latencies[hostname].append(latency)
+
+	def __quantile(self, hostname, q=0.95):
+		"""
+		The `q` quantile of recent latencies to `hostname` (None until
+		enough requests have been seen).
+		"""
+		with self.lock:
+			latencies = sorted(self.latencies.get(hostname, ()))
+		if len(latencies) < 20:
+			return None
+		return latencies[ int(q * (len(latencies) - 1)) ]
+
+	def __open(self, url, data, headers, deadline, idempotent=True):
+		"""
+		Send the request on a pooled connection and wait for the response
+		headers. Returns an exchange (host, connection, response, started,
+		sent) whose body is then read with `__chunks` and which is ended
+		with `__close`. A request that is not `idempotent` is sent on a new
+		connection, so that it never needs to be sent again.
+		"""
+		parts = urlsplit(url)
+		if parts.scheme not in ('http', 'https'):
+			raise URLError('unsupported scheme `{}`'.format(parts.scheme))
+
+		host = (parts.scheme, parts.hostname, parts.port)
+		path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+
+		method  = 'GET' if data is None else 'POST'
+		headers = dict({ 'Connection': 'keep-alive', 'User-Agent': 'SLiPy' },
+			**headers)
+		if self.compress:
+			headers.setdefault('Accept-Encoding', 'gzip, deflate')
+		if data is not None:
+			headers.setdefault('Content-Type',
+				'application/x-www-form-urlencoded')
+
+		# a pooled connection may have been dropped by the server while
+		# idle; in that case retry once on a fresh connection
+		for attempt in (0, 1):
+			timeout = self.__timeout(deadline)
+			started = None
+			if self.governor is not None:
+				# the wait for the governor counts against the deadline
+				started = self.governor.acquire(parts.hostname, deadline)
+				if started is None:
+					raise URLError(DeadlineExceeded('deadline exceeded'))
+				try:
+					timeout = self.__timeout(deadline)
+				except URLError:
+					self.governor.cancel(parts.hostname)
+					raise
+
+			connection = self.__acquire(host, timeout, fresh=not idempotent)
+			reused     = connection.sock is not None
+			sent       = time.monotonic()
+			try:
+				connection.request(method, path, body=data, headers=headers)
+				response = connection.getresponse()
+
+			except (HTTPException, OSError) as err:
+				connection.close()
+				if self.governor is not None:
+					self.governor.release(parts.hostname, started, error=err)
+				if reused and attempt == 0:
+					continue
+				raise URLError(err)
+
+			# the slot is given back as soon as the answer starts: the body
+			# may be read at the pace of the caller (see `stream`), which
+			# says nothing about the host
+			if self.governor is not None:
+				self.governor.release(parts.hostname, started,
+					status=response.status)
+			return host, connection, response, started, sent
+
+	def __chunks(self, exchange):
+		"""
+		Decoded body of an exchange, chunk by chunk as it arrives.
+		"""
+		response = exchange[2]
+		decoder  = Decoder(response.getheader('Content-Encoding'))
+		try:
+			while True:
+				chunk = response.read1(self.chunk_size)
+				if not chunk:
+					# whole body read; the connection may be reused
+					response.close()
+					break
+				chunk = decoder.decompress(chunk)
+				if chunk:
+					yield chunk
+
+			chunk = decoder.flush()
+			if chunk:
+				yield chunk
+
+		except (HTTPException, OSError, zlib.error) as err:
+			self.__close(exchange, err)
+			raise URLError(err)
+
+	def __close(self, exchange, error=None):
+		"""
+		End an exchange: give back the connection (unless it failed).
+		"""
+		host, connection, response, started, sent = exchange
+
+		if error is not None or response.will_close or not response.isclosed():
+			connection.close()
+		else:
+			self.__release(host, connection)
+
+	def __send(self, url, data, headers, deadline, idempotent=True):
+		"""
+		Single request/response exchange on a pooled connection.
+		"""
+		exchange = self.__open(url, data, headers, deadline, idempotent)
+		body     = b''.join(self.__chunks(exchange))
+		self.__close(exchange)
+
+		# read without pause, so the whole exchange is the host's latency
+		self.__record(exchange[0][1], time.monotonic() - exchange[4])
+
+		return Response(url, exchange[2].status, exchange[2].headers, body)
+
+	def __hedged(self, url, data, headers, deadline):
+		"""
+		`__send`, sent a second time if no answer has come back after the
+		95th percentile of recent latencies; the first answer wins.
+		"""
+		delay = self.__quantile(urlsplit(url).hostname) if self.hedge else None
+		if delay is None:
+			return self.__send(url, data, headers, deadline)
+
+		with self.lock:
+			if self.hedger is None:
+				self.hedger = ThreadPoolExecutor(max_workers=64,
+					thread_name_prefix='slipy-hedge')
+
+		pending = { self.hedger.submit(self.__send, url, data, headers,
+			deadline) }
+		done, _ = wait(pending, timeout=delay if deadline is None else
+			max(0, min(delay, deadline - time.monotonic())))
+		if not done and (deadline is None or time.monotonic() < deadline):
+			# the duplicate is held to the same deadline
+			pending.add( self.hedger.submit(self.__send, url, data, headers,
+				deadline) )
+
+		while pending:
+			done, pending = wait(pending, return_when=FIRST_COMPLETED,
+				timeout=None if deadline is None else
+				max(0, deadline - time.monotonic()))
+			if not done:
+				raise URLError(DeadlineExceeded('deadline exceeded'))
+			for future in done:
+				if future.exception() is None:
+					return future.result()
+				error = future.exception()
+
+		raise error
+
+	def request(self, url, data=None, headers=None, cache=True,
+		negative=None, deadline=None):
+		"""
+		Retrieve `url` (POST `data` if given) and return a `Response`.
+		Failures raise `URLError` (or `HTTPError`), as `urlopen` does.
+		With `cache` False the cache (if any) is neither read nor written.
+		`negative` is a function of the body, True for negative answers
+		(cached for the shorter `negative_ttl` of the cache). Attempts stop
+		at `deadline` (see `Deadline`).
+		"""
+		cache = self.cache if cache else None
+		if cache is not None:
+			entry = cache.lookup(url, data)
+			if entry is not None:
+				body, expires = entry
+				stale = expires < time.time()
+				if stale:
+					self.__revalidate(cache, url, data, headers, negative)
+				return Response(url, 200, {}, body, cached=True, stale=stale)
+
+		try:
+			return self.__share(cache, url, data, headers, negative, deadline)
+
+		except URLError:
+			body = self.fallback(url, data) if cache is not None else None
+			if body is None:
+				raise
+			return Response(url, 200, {}, body, cached=True, stale=True)
+
+	def submit(self, url, data=None, headers=None, deadline=None):
+		"""
+		Send a request that changes state on the server (e.g., creating a
+		job) exactly once and return its `Response`: it is neither cached
+		nor shared with identical requests, retried nor hedged. Failures
+		raise `URLError` (or `HTTPError`) as with `request`.
+		"""
+		return self.__fetch(url, data, headers, deadline, idempotent=False)
+
+	def fallback(self, url, data=None):
+		"""
+		Cached body for the request, however stale, if the circuit to its
+		host is open and the breaker allows falling back (else None).
+		"""
+		if (self.cache is None or self.breaker is None or
+			not self.breaker.fallback or
+			not self.breaker.is_open(urlsplit(url).hostname)):
+			return None
+
+		entry = self.cache.lookup(url, data, stale=float('inf'))
+		return None if entry is None else entry[0]
+
+	def stream(self, url, data=None, headers=None, cache=True,
+		negative=None, deadline=None):
+		"""
+		Retrieve `url` like `request`, but yield the (decoded) body chunk
+		by chunk as it arrives instead of returning a `Response`. The body
+		is stored in the cache once complete, unless it is larger than
+		`STREAM_CACHE_LIMIT`. A request that fails before
+		the body starts (or would be answered from the cache) goes through
+		`request` instead, with its retries and fallback; one that fails
+		midway raises `URLError`.
+		"""
+		hostname = urlsplit(url).hostname
+		store    = self.cache if cache else None
+		exchange = None
+
+		if ((store is None or store.lookup(url, data) is None) and
+			(self.breaker is None or not self.breaker.is_open(hostname))):
+			try:
+				exchange = self.__open(url, data, headers or {}, deadline)
+				for redirect in range(self.redirects):
+					if exchange[2].status not in (301, 302, 303, 307, 308):
+						break
+					location = exchange[2].getheader('Location')
+					if location is None:
+						break
+					exchange[2].read()
+					self.__close(exchange)
+					url      = urljoin(url, location)
+					data     = None if exchange[2].status == 303 else data
+					exchange = self.__open(url, data, headers or {}, deadline)
+
+				if exchange[2].status >= 300:
+					exchange[2].read()
+					self.__close(exchange)
+					exchange = None
+
+			except (HTTPException, OSError) as err:
+				self.__close(exchange, err)
+				exchange = None
+
+			except URLError:
+				exchange = None
+
+		if exchange is None:
+			body = self.request(url, data, headers, cache, negative,
+				deadline).read()
+			for start in range(0, len(body), self.chunk_size):
+				yield body[start:start + self.chunk_size]
+			return
+
+		chunks = [] if store is not None else None
+		size   = 0
+		try:
+			for chunk in self.__chunks(exchange):
+				if chunks is not None:
+					size += len(chunk)
+					chunks = chunks if size <= STREAM_CACHE_LIMIT else None
+					if chunks is not None:
+						chunks.append(chunk)
+				yield chunk
+
+		except URLError:
+			if self.breaker is not None:
+				self.breaker.failure(hostname)
+			raise
+
+		except BaseException as err:
+			# abandoned by the caller (or interrupted) midway
+			self.__close(exchange, err)
+			raise
+
+		self.__close(exchange)
+		if self.breaker is not None:
+			self.breaker.success(hostname)
+
+		if chunks is not None:
+			body = b''.join(chunks)
+			store.put(url, data, body, negative is not None and negative(body))
+
+	def __share(self, cache, url, data, headers, negative, deadline):
+		"""
+		Fetch and store, sharing the request with identical ones in flight.
+		"""
+		if not self.share:
+			return self.__store(cache, url, data, headers, negative, deadline)
+
+		return self.flights.do( Normalize(url, data), lambda:
+			self.__store(cache, url, data, headers, negative, deadline),
+			deadline )
+
+	def __revalidate(self, cache, url, data, headers, negative):
+		"""
+		Refresh a stale entry on a background thread, unless it is already
+		being refreshed or `refreshers` refreshes are under way.
+		"""
+		key = Normalize(url, data)
+		with self.lock:
+			if key in self.refreshing or len(self.refreshing) >= self.refreshers:
+				return
+			self.refreshing.add(key)
+			if self.refresher is None:
+				self.refresher = ThreadPoolExecutor(max_workers=self.refreshers,
+					thread_name_prefix='slipy-refresh')
+
+		def refresh():
+			try:
+				self.__share(cache, url, data, headers, negative, None)
+			except Exception:
+				# the stale entry stays until the next attempt
+				pass
+			finally:
+				with self.lock:
+					self.refreshing.discard(key)
+
+		self.refresher.submit(refresh)
+
+	def __store(self, cache, url, data, headers, negative, deadline):
+		"""
+		Retrieve `url` from the network and keep the body in `cache`.
+		"""
+		response = self.__fetch(url, data, headers, deadline)
+
+		if cache is not None:
+			cache.put(url, data, response.data,
+				negative is not None and negative(response.data))
+
+		return response
+
+	def __fetch(self, url, data, headers, deadline, idempotent=True):
+		"""
+		Retrieve `url` from the network unless the circuit to its host is
+		open, and report the outcome to the breaker. Only `idempotent`
+		requests are retried.
+		"""
+		send = self.__retry if idempotent else self.__once
+		if self.breaker is None:
+			return send(url, data, headers, deadline)
+
+		hostname = urlsplit(url).hostname
+		if not self.breaker.allow(hostname):
+			raise URLError(BreakerError('circuit to `{}` is open'
+				.format(hostname)))
+
+		try:
+			response = send(url, data, headers, deadline)
+
+		except HTTPError as err:
+			if err.code >= 500:
+				self.breaker.failure(hostname)
+			else:
+				self.breaker.success(hostname)
+			raise
+
+		except URLError as err:
+			if isinstance(err.reason, DeadlineExceeded):
+				# says nothing about the host; give back a half-open probe
+				self.breaker.cancel(hostname)
+			else:
+				self.breaker.failure(hostname)
+			raise
+
+		self.breaker.success(hostname)
+		return response
+
+	def __retry(self, url, data, headers, deadline):
+		"""
+		Retrieve `url` from the network, with up to `retries` further
+		attempts after jittered exponential backoff.
+		"""
+		headers = {} if headers is None else headers
+		for attempt in range(self.retries + 1):
+			wait_for = 0
+			try:
+				response = self.__follow(url, data, headers, deadline)
+				if response.status < 300:
+					return response
+
+				error = HTTPError(response.url, response.status,
+					'HTTP status {}'.format(response.status),
+					response.headers, None)
+				if response.status not in RETRY_STATUS:
+					raise error
+
+				retry_after = response.headers.get('Retry-After', '')
+				if retry_after.isdigit():
+					wait_for = float(retry_after)
+
+			except HTTPError:
+				raise
+
+			except URLError as err:
+				error = err
+
+			if attempt == self.retries:
+				raise error
+
+			delay = max(wait_for, random.uniform(0,
+				min(self.max_backoff, self.backoff * 2**attempt)))
+			if deadline is not None and time.monotonic() + delay >= deadline:
+				raise error
+			time.sleep(delay)
+
+	def __once(self, url, data, headers, deadline):
+		"""
+		Retrieve `url` from the network in a single attempt, not hedged.
+		"""
+		response = self.__follow(url, data, {} if headers is None else headers,
+			deadline, idempotent=False)
+		if response.status >= 300:
+			raise HTTPError(response.url, response.status,
+				'HTTP status {}'.format(response.status), response.headers, None)
+		return response
+
+	def __follow(self, url, data, headers, deadline, idempotent=True):
+		"""
+		Retrieve `url` from the network, following redirects. Requests that
+		are not `idempotent` are sent once, without hedging, until a redirect
+		turns them into a GET.
+		"""
+		for redirect in range(self.redirects + 1):
+			if idempotent:
+				response = self.__hedged(url, data, headers, deadline)
+			else:
+				response = self.__send(url, data, headers, deadline, False)
+
+			if response.status in (301, 302, 303, 307, 308):
+				location = response.headers.get('Location')
+				if location is None:
+					break
+				url = urljoin(url, location)
+				if response.status == 303:
+					data       = None
+					idempotent = True
+				continue
+
+			break
+
+		return response
+
+	def close(self):
+		"""
+		Close every idle connection (and stop background refreshes).
+		"""
+		with self.lock:
+			pools, self.pools = self.pools, {}
+			refresher, self.refresher = self.refresher, None
+			hedger, self.hedger = self.hedger, None
+
+		for executor in (refresher, hedger):
+			if executor is not None:
+				executor.shutdown(wait=False)
+
+		for pool in pools.values():
+			while True:
+				try:
+					pool.get_nowait().close()
+				except Empty:
+					break
+
+# transport used when a query is not given one
+_transport = None
+_lock      = threading.Lock()
+
+def GetTransport(transport=None):
+	"""
+	Return `transport` if given, else the shared default `Transport`
+	(created on first use).
+	"""
+	global _transport
+
+	if transport is not None:
+		return transport
+
+	with _lock:
+		if _transport is None:
+			_transport = Transport()
+		return _transport
+
+def SetTransport(transport):
+	"""
+	Replace the shared default transport (e.g., to change `pool_size`).
+	"""
+	global _transport
+
+	if not hasattr(transport, 'request'):
+		raise TransportError('SetTransport expects an object with a '
+			'`request` method (e.g., a Transport).')
+
+	with _lock:
+		_transport = transport
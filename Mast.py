@@ -1,7 +1,5 @@
 from sys import stdout,argv, exit  # , version_info
-from urllib.request import urlopen
 from urllib.error import URLError
-from io import StringIO
 import gzip
 
 #from astropy import units as u
@@ -9,6 +7,9 @@ import gzip
 from . import SlipyError
 from .Framework.Command import Parse, CommandError
 from .Framework.Options import Options, OptionsError
+from .Framework.Transport import GetTransport, Deadline
+from .Framework.Payload import Payload
+from .Framework.Async import Run
 
 
 class MastError(SlipyError):
@@ -42,6 +43,16 @@ def URLEncoded(url):
         for character in list(url)])
 
 
+def _Empty(body):
+    """
+    True if the MAST return file `body` (bytes) is a negative answer: an
+    error or `no rows found` in place of the two header lines of the CSV,
+    or no rows after them. The rows themselves are not searched.
+    """
+    payload = Payload(body, lines=2, parse=False)
+    return (payload.reports(b'no rows found', b'not found', b'error') or
+        payload.head >= payload.end)
+
 def MastScript(instrument,criteria,**kwargs):
 	script= [
 		'https://archive.stsci.edu/',
@@ -77,22 +88,32 @@ class MastQuery:
     def __init__(self, instrument, criteria, default=float, **kwargs):
         if type(instrument) is not str and type(criteria) is not str:
             raise MastError('Mast.MastQuery function expects str types for arguments.')
+        # not an `Options` keyword
+        transport = GetTransport(kwargs.pop('transport', None))
         try:
             self.options = Options(kwargs,
                     {
                     'parse'  : True    , # parse SIMBAD return file
                     'full'   : False   , # return full line of info
                     'dtype'  : default , # convert return data
-                    'is_main': False
+                    'is_main': False   ,
+                    'cache'  : True    , # use the transport's cache
+                    'deadline': 0.0      # seconds allowed (0 for none)
                     })
             self.parse   = self.options('parse')
             self.full    = self.options('full')
             self.dtype   = self.options('dtype')
             self.is_main = self.options('is_main')
+            self.cache   = self.options('cache')
+            self.deadline = Deadline(self.options('deadline'))
             url=MastScript(instrument,criteria)
             #print url
-            response=urlopen(url)
-            self.data = str( response.read().decode('utf-8')).strip()
+            response=transport.request(url, cache=self.cache, negative=_Empty,
+                deadline=self.deadline)
+            self.stale = getattr(response, 'stale', False)
+            # errors are reported in place of the two header lines of the
+            # CSV; only the data is decoded
+            payload = Payload(response.read(), lines=2, parse=self.parse)
 
         except OptionsError as err:
             print('\n --> OptionsError:', err.msg )
@@ -101,12 +122,10 @@ class MastQuery:
         except URLError as error:
             raise MastError('Failed to contact MAST database')
 
-        if 'not found' in self.data or 'error' in self.data:
+        if payload.reports(b'not found', b'error'):
             raise MastError('could not be resolved by SIMBAD.')
 
-        if self.parse:
-            # pre-parse operation common to all criteria
-            self.data = self.data.split('data')[-1]
+        self.data = payload.text()
 
     def __call__(self):
         """
@@ -116,6 +135,7 @@ class MastQuery:
 
 def IUESearch(**kwargs):
 	dataset='iue'
+	transport=kwargs.pop('transport', None)
 	try:
 		opts=Options(kwargs,
 		{
@@ -124,7 +144,9 @@ def IUESearch(**kwargs):
 			'dec'    : '',
 			'radius' : '3.0',#radius must be in arcmins
 			'cam'    : '3',#defaults is short wav camera only
-			'mx'     : 100
+			'mx'     : 100,
+			'cache'  : True,
+			'deadline': 0.0
 		})
 		target=opts('target')
 		ra=opts('ra')
@@ -132,6 +154,8 @@ def IUESearch(**kwargs):
 		radius=opts('radius')
 		cam=opts('cam')
 		mx=str(opts('mx'))
+		cache=opts('cache')
+		deadline=opts('deadline')
 	except OptionsError as err:
 		print('\n --> OptionsError:')
 		raise SimbadError('Simbad.Query was not constructed')
@@ -146,11 +170,12 @@ def IUESearch(**kwargs):
 	else:
 		raise MastError('Need to Provide RA/DEC or target!')
 	critstring += '&radius='+radius
-	query=MastQuery(dataset, critstring)
+	query=MastQuery(dataset, critstring, transport=transport, cache=cache,
+		deadline=deadline)
 	return [x.split(',') for x in query.data.split('\n')[2:]]
 
 #Expected format of dataset is list entry returned by IUESearch
-def GetIUEDataset(dataset):
+def GetIUEDataset(dataset, transport=None):
 	#Create url from dataset info
 	dataset_name=dataset[0]
 	pref=dataset_name[0:3]
@@ -163,8 +188,10 @@ def GetIUEDataset(dataset):
 	#stdout.flush()
 
 	#Get data from .gz url
-	response=urlopen(dataset_url)
-	data=[x.strip() for x in (gzip.GzipFile(fileobj=StringIO(response.read()), mode='r')).read().split('\n')]
+	body=GetTransport(transport).request(dataset_url).read()
+	if body[:2] == b'\x1f\x8b': # unless decoded by the transport already
+		body=gzip.decompress(body)
+	data=[x.strip() for x in body.decode('utf-8').split('\n')]
 	#Parse wavelength info from header
 	if data[18][0] != 'w':
 		#Low dispersion spectra
@@ -236,6 +263,7 @@ def STISSearch(**kwargs):
     Returns a list of STISDataset objects
     """
     dataset='hst'
+    transport=kwargs.pop('transport', None)
     try:
         opts=Options(kwargs,
         {
@@ -247,7 +275,9 @@ def STISSearch(**kwargs):
         	'grating' : 'E140H',
             'obs_type': 'S', # S or C for science or calibration, % for both
             'status'  : '%', # Public or Proprietary, % for both
-        	'mx'      : 100
+        	'mx'      : 100,
+            'cache'   : True,
+            'deadline': 0.0
         })
         target=opts('target')
         ra=opts('ra')
@@ -258,6 +288,8 @@ def STISSearch(**kwargs):
         sci_status=opts('status')
         mx=str(opts('mx'))
         grating=opts('grating')
+        cache=opts('cache')
+        deadline=opts('deadline')
     except OptionsError as err:
         print('\n --> OptionsError:')
         raise MastError('Mast query was not constructed')
@@ -282,8 +314,30 @@ def STISSearch(**kwargs):
     	critstring += '&ra='+ra+'&dec='+dec
     if target != '' and ra != '' and dec != '':
         critstring += '&radius='+radius
-    query=MastQuery(dataset, critstring)
+    query=MastQuery(dataset, critstring, transport=transport, cache=cache,
+        deadline=deadline)
     if query.data.strip() != 'no rows found':
         return [STISDataset(x) for x in query.data.split('\n')[2:]]
     else:
         return []
+
+#Awaitable counterparts of the searches above, for use from asyncio.
+#Each runs the synchronous function on the shared executor of
+#Framework.Async, so parsing and results are the same on both paths.
+async def aiue_search(**kwargs):
+    """
+    Awaitable `IUESearch`.
+    """
+    return await Run(IUESearch, **kwargs)
+
+async def aget_iue_dataset(dataset, transport=None):
+    """
+    Awaitable `GetIUEDataset`.
+    """
+    return await Run(GetIUEDataset, dataset, transport)
+
+async def astis_search(**kwargs):
+    """
+    Awaitable `STISSearch`.
+    """
+    return await Run(STISSearch, **kwargs)
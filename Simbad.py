@@ -11,7 +11,7 @@ inside Python or shell commands/scripts.
 The 'Attribute' points to a function within this module and indicates
 what is to be run. Execute 'Simbad.py @Attribute help' for usage details of
 a specific function. Currently available attributes are: `Position`,
-`Distance`, and `Sptype`.
+`Distance`, `Sptype`, `IDList` and `Record`.
 
 The identifier names can be anything recognized by SIMBAD (e.g., Regulus,
 "alpha leo", "HD 121475", "del cyg", etc ...) if the name is two parts make
@@ -21,16 +21,30 @@ The **kwargs is the conventional reference to Python keyword arguments.
 These should be specific to the 'Attribute' being pointed to.
 """
 from sys import argv, exit  # , version_info
-from urllib.request import urlopen
-from urllib.error import URLError
+from urllib.error import URLError, HTTPError
+from urllib.parse import urlencode
 from string import digits
+from collections import OrderedDict
+import threading
+import codecs
+import time
+import csv
 import re
+import fnmatch
+from array import array
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 from astropy import units as u
+from astropy.io.votable import parse as parse_votable
 
 from . import SlipyError
 from .Framework.Command import Parse, CommandError
 from .Framework.Options import Options, OptionsError
+from .Framework.Transport import GetTransport, Deadline, DeadlineExceeded
+from .Framework.Payload import Payload, WHITESPACE
+from .Framework.Async import Run
 
 
 class SimbadError(SlipyError):
@@ -81,6 +95,137 @@ def IDScript(identifier, criteria):
 
     return ''.join(script)
 
+def NormalizeID(identifier):
+    """
+    NormalizeID( identifier ):
+
+    Canonical form of a SIMBAD identifier for cache lookups: upper case,
+    single spaces, without the `NAME`/`*`/`**`/`V*` prefixes SIMBAD puts in
+    front of proper names and stellar designations, and with a space
+    between a catalog acronym and its number (`HD36486` -> `HD 36486`).
+    """
+    name = ' '.join(identifier.upper().split())
+    for prefix in ('NAME ', 'V* ', '** ', '* '):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+
+    return re.sub(r'^([A-Z]+) ?(?=\d)', r'\1 ', name)
+
+class IDCache:
+    """
+    IDCache( **kwargs ):
+
+    In-process LRU cache of SIMBAD return files for `IDQuery`, keyed on the
+    object rather than the identifier string. Identifiers are compared by
+    `NormalizeID` and every alias learned from an `IDList` result refers to
+    the same object, so "HD 36486", "del Ori" and "HR 1852" share entries.
+    Entries expire after `ttl` seconds, so that the transport's cache (and
+    its negative TTL and stale handling) is consulted again. Off unless
+    set with `SetIDCache`.
+
+    kwargs = {
+        'size' : 4096,  # return files kept at most
+        'ttl'  : 600.0, # seconds a return file is served
+    }
+    """
+    def __init__(self, **kwargs):
+        try:
+            self.options = Options( kwargs, { 'size' : 4096, 'ttl' : 600.0 })
+            self.size    = self.options('size')
+            self.ttl     = self.options('ttl')
+
+        except OptionsError as err:
+            print('\n --> OptionsError:', err.msg )
+            raise SimbadError('Simbad.IDCache was not constructed.')
+
+        self.entries = OrderedDict() # (object, criteria) -> (expiry, file)
+        self.aliases = {}            # normalized identifier -> object
+        self.lock    = threading.Lock()
+
+    def __object(self, identifier):
+        """
+        Key of the object `identifier` refers to.
+        """
+        name = NormalizeID(identifier)
+        return self.aliases.get(name, name)
+
+    def get(self, identifier, criteria):
+        """
+        Cached return file for `criteria` of `identifier`, or None.
+        """
+        with self.lock:
+            key = (self.__object(identifier), criteria)
+            if key not in self.entries:
+                return None
+            expiry, data = self.entries[key]
+            if time.monotonic() >= expiry:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return data
+
+    def put(self, identifier, criteria, data):
+        """
+        Store the return file `data` for `criteria` of `identifier`.
+        """
+        with self.lock:
+            key = (self.__object(identifier), criteria)
+            self.entries[key] = (time.monotonic() + self.ttl, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def learn(self, identifier, aliases):
+        """
+        Record that `identifier` and every one of `aliases` (e.g., the
+        result of `IDList`) refer to the same object.
+        """
+        with self.lock:
+            target = self.__object(identifier)
+            merged = { self.__object(alias) for alias in aliases } - {target}
+
+            for name in [ NormalizeID(alias) for alias in aliases ]:
+                self.aliases[name] = target
+
+            if not merged:
+                return
+
+            # objects previously thought distinct are the same one
+            for name, key in list(self.aliases.items()):
+                if key in merged:
+                    self.aliases[name] = target
+            for key in [ key for key in self.entries if key[0] in merged ]:
+                self.entries.setdefault((target, key[1]), self.entries[key])
+                del self.entries[key]
+
+    def clear(self):
+        """
+        Forget every return file and alias.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.aliases.clear()
+
+# cache consulted by `IDQuery`, None (the default) to disable
+_idcache = None
+
+def GetIDCache():
+    """
+    Return the `IDCache` used by `IDQuery` (None if disabled).
+    """
+    return _idcache
+
+def SetIDCache(cache):
+    """
+    Replace the `IDCache` used by `IDQuery` (None to disable it).
+    """
+    global _idcache
+
+    if cache is not None and not isinstance(cache, IDCache):
+        raise SimbadError('SetIDCache expects an IDCache or None.')
+    _idcache = cache
+
 class IDQuery:
     """
     IDQuery( identifier, criteria, **kwargs ):
@@ -92,6 +237,15 @@ class IDQuery:
         'parse' : True,  # extract relavent data from SIMBAD return file
         'dtype' : float, # output datatype
     }
+
+    A `response` keyword with the already retrieved SIMBAD text skips the
+    request (used by `BatchIDQuery`). A `transport` keyword overrides the
+    shared `Framework.Transport` used for the request. With an `IDCache`
+    set (see `SetIDCache`) and `cache` True, fresh return files are kept
+    in (and served from) it. With a `Coalescer` set, the request is
+    batched with concurrent ones.
+    `stale` is True if SIMBAD was unavailable and the return file came
+    from an expired cache entry.
     """
     def __init__(self, identifier, criteria, default=float, **kwargs):
         """
@@ -102,6 +256,13 @@ class IDQuery:
             raise SimbadError('Simbad.Query function expects str'
             'types for arguments.')
 
+        self.identifier = identifier
+        self.criteria   = criteria
+
+        # pre-fetched return file and transport, not `Options` keywords
+        response  = kwargs.pop('response', None)
+        transport = GetTransport( kwargs.pop('transport', None) )
+
         try:
             # keyword argument options for Query
             self.options = Options( kwargs,
@@ -109,7 +270,9 @@ class IDQuery:
                     'parse'  : True    , # parse SIMBAD return file
                     'full'   : False   , # return full line of info
                     'dtype'  : default , # convert return data
-                    'is_main': False     # called from Main()
+                    'is_main': False   , # called from Main()
+                    'cache'  : True    , # use the transport's cache
+                    'deadline': 0.0      # seconds allowed (0 for none)
                 })
 
             # assignments
@@ -117,12 +280,31 @@ class IDQuery:
             self.full    = self.options('full')
             self.dtype   = self.options('dtype')
             self.is_main = self.options('is_main')
+            self.cache   = self.options('cache')
+            self.deadline = Deadline(self.options('deadline'))
 
             # query SIMBAD database
             #with urlopen( Script(identifier, criteria) ) as response:
             #    self.data = str( response.read().decode('utf-8') ).strip()
-            response = urlopen( IDScript(identifier, criteria) )
-            self.data = str( response.read().decode('utf-8')).strip()
+            idcache = _idcache if self.cache else None
+            cached  = False
+            self.stale = isinstance(response, _Stale)
+            if response is None and idcache is not None:
+                # any alias of `identifier` seen before
+                response = idcache.get(identifier, criteria)
+                cached   = response is not None
+            if response is None and _coalescer is not None:
+                # sent along with other identifiers in a batched script
+                response = _coalescer.request(identifier, criteria,
+                    transport, self.cache, self.deadline)
+                self.stale = isinstance(response, _Stale)
+            if response is None:
+                response = transport.request(IDScript(identifier, criteria),
+                    cache=self.cache, negative=_Unresolved,
+                    deadline=self.deadline)
+                self.stale = getattr(response, 'stale', False)
+                response = response.read().decode('utf-8')
+            self.data = str( response ).strip()
 
 
         except OptionsError as err:
@@ -138,6 +320,9 @@ class IDQuery:
             raise SimbadError('`{}` could not be resolved by SIMBAD.'
                 .format(identifier))
 
+        if idcache is not None and not cached and not self.stale:
+            idcache.put(identifier, criteria, self.data)
+
         if self.parse:
             # pre-parse operation common to all criteria
             self.data = self.data.split('data')[-1]
@@ -148,14 +333,363 @@ class IDQuery:
         """
         return self.data
 
-def Position( identifier, **kwargs ):
+# record separator for batched sim-script queries
+BATCH_MARKER = '::record::'
+
+def IDBatchScript(identifiers, criteria):
     """
-    Position( identifier, **kwargs ):
+    IDBatchScript( identifiers, criteria ):
 
-    Handle to the Query class with criteria='%C00(d;C)'.
+    POST body for the SIMBAD sim-script service. A single `format object`
+    line is followed by one identifier per line. Every record is prefixed
+    by `BATCH_MARKER` so the return file can be split per identifier.
     """
-    query = IDQuery( identifier, '%COO(d;C)', **kwargs )
+    script = ['format object "{}\\n{}"'.format(BATCH_MARKER, criteria)]
+    script.extend(identifiers)
+
+    return urlencode({ 'script': '\n'.join(script) }).encode('utf-8')
+
+def _split_batch(data, identifiers):
+    """
+    Split the return file of a batched sim-script into a list holding, for
+    each of `identifiers`, either text shaped like the return file of a
+    single `IDQuery` or a `SimbadError`.
+    """
+    head, _, body = data.partition('::data')
+    if BATCH_MARKER in body:
+        rule, _, body = body.partition(BATCH_MARKER)
+        records = [ rule + record.lstrip('\r\n').rstrip()
+            for record in body.split(BATCH_MARKER) ]
+    else: records = []
+
+    # errors are reported as `[line] message`, line 1 is the format line
+    failed = {}
+    for line in head.split('::error')[-1].split('\n') if '::error' in head else []:
+        match = re.match(r'\s*\[(\d+)\]\s*(.*)', line)
+        if not match:
+            continue
+        index = int(match.group(1)) - 2
+        if not 0 <= index < len(identifiers):
+            # fall back on the identifier quoted at the end of the message
+            name = match.group(2).split(':')[-1].strip()
+            index = identifiers.index(name) if name in identifiers else None
+        if index is None:
+            raise SimbadError('SIMBAD rejected batch script: {}'
+                .format(match.group(2)))
+        failed[index] = SimbadError('`{}` could not be resolved by SIMBAD.'
+            .format(identifiers[index]))
+
+    if len(records) != len(identifiers) - len(failed):
+        raise SimbadError('SIMBAD returned {} records for {} identifiers.'
+            .format(len(records), len(identifiers) - len(failed)))
+
+    records = iter(records)
+    return [ failed[i] if i in failed else next(records)
+        for i in range(len(identifiers)) ]
+
+def _Unresolved(body):
+    """
+    True if the SIMBAD return file `body` (bytes) is a negative answer: an
+    identifier that could not be resolved, or a search without results.
+    Only the head is searched for errors (see `Payload`), and an answer is
+    empty if no data follows it.
+    """
+    payload = Payload(body, heads=(b'\n#|',))
+    if payload.reports(b'not found', b'error', b'No astronomical object'):
+        return True
+    # past the rest of the section banner ('::data::::')
+    start = payload.data
+    while start < payload.end and body[start] in b':' + WHITESPACE:
+        start += 1
+    return start == payload.end
+
+class _Stale(str):
+    """
+    Return file served from an expired cache entry.
+    """
+    pass
+
+def _FetchBatch(identifiers, criteria, transport, cache=True, deadline=None):
+    """
+    Records for `identifiers` (see `_split_batch`), from the cache of the
+    transport where possible and otherwise from one batched sim-script.
+    Each record is cached under the URL of the matching single `IDQuery`
+    (unresolved ones as negative entries), so batched, coalesced and single
+    queries share cache entries. If SIMBAD cannot be reached, identifiers
+    with an expired entry the transport may fall back on get it (as a
+    `_Stale` record) and the others a `SimbadError`.
+    """
+    store   = getattr(transport, 'cache', None) if cache else None
+    records = {}
+    if store is not None:
+        for identifier in identifiers:
+            body = store.get( IDScript(identifier, criteria) )
+            if body is not None:
+                records[identifier] = body.decode('utf-8')
+
+    pending = list(dict.fromkeys( identifier for identifier in identifiers
+        if identifier not in records ))
+    if pending:
+        try:
+            response = transport.request( 'http://simbad.u-strasbg.fr/simbad/'
+                'sim-script', IDBatchScript(pending, criteria), cache=False,
+                deadline=deadline )
+            response = response.read().decode('utf-8')
+
+        except URLError as error:
+            failed = SimbadError('Failed to contact SIMBAD database for'
+                ' {} identifiers'.format(len(pending)) )
+
+            # while SIMBAD is down, carry on with expired entries
+            fallback = getattr(transport, 'fallback', None) if cache else None
+            stale    = {}
+            for identifier in pending if fallback is not None else []:
+                body = fallback( IDScript(identifier, criteria) )
+                if body is not None:
+                    stale[identifier] = _Stale(body.decode('utf-8'))
+            if not stale:
+                raise failed
+
+            return [ records.get(identifier) or stale.get(identifier, failed)
+                for identifier in identifiers ]
+
+        for identifier, record in zip(pending,
+            _split_batch(response, pending)):
+            records[identifier] = record
+            if store is None:
+                continue
+            if isinstance(record, SimbadError):
+                store.put( IDScript(identifier, criteria), None,
+                    'Identifier not found in the database : {}'
+                    .format(identifier).encode('utf-8'), negative=True )
+            else:
+                store.put( IDScript(identifier, criteria), None,
+                    record.encode('utf-8') )
+
+    return [ records[identifier] for identifier in identifiers ]
+
+class BatchIDQuery:
+    """
+    BatchIDQuery( identifiers, criteria, **kwargs ):
+
+    Class for querying the SIMBAD astronomical database for 'criteria' of
+    many 'identifiers' at once. Identifiers are sent `chunk` at a time in
+    a single POSTed sim-script, rather than one request each.
+
+    kwargs = {
+        'chunk'     : 500,  # identifiers per request
+        'deadline'  : 0.0,  # seconds allowed for every chunk (0 for none)
+        'transport' : None, # `Framework.Transport` (shared one if None)
+        ...                 # any other `IDQuery` keyword argument
+    }
+
+    Calling the object returns a list of `IDQuery` objects in the order of
+    `identifiers`, with a `SimbadError` in place of each identifier that
+    SIMBAD could not resolve.
+    """
+    def __init__(self, identifiers, criteria, default=float, **kwargs):
+        """
+        Initiate queries to SIMBAD database.
+        """
+        # check argument types
+        if (type(criteria) is not str or
+            any(type(identifier) is not str for identifier in identifiers)):
+            raise SimbadError('Simbad.BatchIDQuery function expects str'
+            'types for arguments.')
+
+        transport = GetTransport( kwargs.pop('transport', None) )
+
+        try:
+            # keyword argument options for BatchIDQuery
+            self.options = Options( kwargs,
+                {
+                    'parse'  : True    , # parse SIMBAD return file
+                    'full'   : False   , # return full line of info
+                    'dtype'  : default , # convert return data
+                    'is_main': False   , # called from Main()
+                    'cache'  : True    , # use the transport's cache
+                    'deadline': 0.0    , # seconds allowed (0 for none)
+                    'chunk'  : 500       # identifiers per request
+                })
+
+            # assignments
+            self.chunk = self.options('chunk')
+            self.cache = self.options('cache')
+            self.deadline = Deadline(self.options('deadline'))
+            if self.chunk < 1:
+                raise SimbadError('`chunk` must be a positive integer.')
+
+        except OptionsError as err:
+            print('\n --> OptionsError:', err.msg )
+            raise SimbadError('Simbad.BatchIDQuery was not constructed.')
+
+        # remaining options are handed to each `IDQuery`
+        kwargs = { key: value for key, value in kwargs.items()
+            if key not in ('chunk', 'deadline') }
+
+        # identifiers (or aliases) already in the `IDCache` are not sent
+        identifiers = list(identifiers)
+        idcache     = _idcache if self.cache else None
+        records     = {}
+        pending     = []
+        for index, identifier in enumerate(identifiers):
+            record = None
+            if idcache is not None:
+                record = idcache.get(identifier, criteria)
+            if record is None:
+                pending.append(index)
+            else:
+                records[index] = record
+
+        for start in range(0, len(pending), self.chunk):
+
+            indices = pending[start:start + self.chunk]
+            batch   = [ identifiers[index] for index in indices ]
+            records.update( zip(indices, _FetchBatch(batch, criteria,
+                transport, self.cache, self.deadline)) )
+
+        self.data = []
+        for index, identifier in enumerate(identifiers):
+            record = records[index]
+            if isinstance(record, SimbadError):
+                self.data.append(record)
+                continue
+            try:
+                self.data.append( IDQuery(identifier, criteria, default,
+                    response=record, **kwargs) )
+            except SimbadError as err:
+                self.data.append(err)
+
+    def __call__(self):
+        """
+        Retrieve data from Query
+        """
+        return self.data
+
+def _Batch(identifiers, criteria, extract, **kwargs):
+    """
+    Run `extract` on each query of a `BatchIDQuery`. Identifiers that fail
+    to resolve (or to extract) have a `SimbadError` in their place.
+    """
+    results = []
+    for query in BatchIDQuery(identifiers, criteria, **kwargs)():
+        if isinstance(query, SimbadError):
+            results.append(query)
+            continue
+        try:
+            results.append( extract(query) )
+        except SimbadError as err:
+            results.append(err)
+        except (ValueError, IndexError) as err:
+            # a record the extraction could not make sense of
+            results.append( SimbadError('Failed to parse the SIMBAD record '
+                'of `{}`: {}'.format(query.identifier, err)) )
+
+    return results
+
+class Coalescer:
+    """
+    Coalescer( **kwargs ):
+
+    Gathers single-identifier `IDQuery` requests with the same criteria
+    made (from any thread) within `window` seconds of each other, and sends
+    them as one batched sim-script of up to `size` identifiers. Each caller
+    receives its own part of the return file. Enable with `SetCoalescer`.
+
+    kwargs = {
+        'window' : 0.02, # seconds to wait for more identifiers
+        'size'   : 500,  # identifiers per request
+    }
+    """
+    def __init__(self, **kwargs):
+        try:
+            self.options = Options( kwargs,
+                {
+                    'window' : 0.02,
+                    'size'   : 500
+                })
+            self.window = self.options('window')
+            self.size   = self.options('size')
+
+        except OptionsError as err:
+            print('\n --> OptionsError:', err.msg )
+            raise SimbadError('Simbad.Coalescer was not constructed.')
+
+        if self.size < 1:
+            raise SimbadError('`size` must be a positive integer.')
+
+        self.batches = {} # (criteria, transport, cache) -> open batch
+        self.lock    = threading.Lock()
+
+    def request(self, identifier, criteria, transport, cache=True,
+        deadline=None):
+        """
+        Return file for `criteria` of `identifier`, shaped like that of a
+        single `IDQuery`. Raises `SimbadError` if it could not be resolved,
+        or `URLError` if it is not there by `deadline` (see `Deadline`).
+        The batch is sent with the earliest deadline of its callers.
+        """
+        key = (criteria, transport, cache)
+        with self.lock:
+            batch  = self.batches.get(key)
+            leader = batch is None
+            if leader:
+                batch = self.batches[key] = { 'identifiers': [],
+                    'full': threading.Event(), 'done': threading.Event(),
+                    'deadline': None }
+            if identifier not in batch['identifiers']:
+                batch['identifiers'].append(identifier)
+            if deadline is not None and (batch['deadline'] is None or
+                deadline < batch['deadline']):
+                batch['deadline'] = deadline
+            if len(batch['identifiers']) >= self.size:
+                # later callers start a new batch
+                del self.batches[key]
+                batch['full'].set()
+
+        if leader:
+            batch['full'].wait(self.window)
+            with self.lock:
+                if self.batches.get(key) is batch:
+                    del self.batches[key]
+            try:
+                batch['records'] = dict( zip(batch['identifiers'],
+                    _FetchBatch(batch['identifiers'], criteria, transport,
+                    cache, batch['deadline'])) )
+            except SimbadError as err:
+                batch['error'] = err
+            finally:
+                batch['done'].set()
+
+        if not batch['done'].wait(None if deadline is None else
+            max(0, deadline - time.monotonic())):
+            raise URLError(DeadlineExceeded('deadline exceeded'))
+        if 'error' in batch:
+            raise batch['error']
+
+        record = batch['records'][identifier]
+        if isinstance(record, SimbadError):
+            raise record
+        return record
+
+# coalescer used by `IDQuery`, None (the default) to disable
+_coalescer = None
+
+def SetCoalescer(coalescer):
+    """
+    Route single-identifier `IDQuery` requests through `coalescer`
+    (None to send each on its own again).
+    """
+    global _coalescer
+
+    if coalescer is not None and not isinstance(coalescer, Coalescer):
+        raise SimbadError('SetCoalescer expects a Coalescer or None.')
+    _coalescer = coalescer
 
+def _ExtractPosition(query):
+    """
+    Parse an `IDQuery` with criteria='%COO(d;C)'.
+    """
     if query.full:
         query.data = query.data.split('\n')[-1]
 
@@ -169,6 +703,21 @@ def Position( identifier, **kwargs ):
         # return formatted data type
         query.data = [ query.dtype(pos) * u.degree for pos in query.data ]
 
+    return query.data
+
+def Position( identifier, **kwargs ):
+    """
+    Position( identifier, **kwargs ):
+
+    Handle to the Query class with criteria='%C00(d;C)'. A list of
+    identifiers is resolved with a `BatchIDQuery`.
+    """
+    if isinstance(identifier, (list, tuple)):
+        return _Batch(identifier, '%COO(d;C)', _ExtractPosition, **kwargs)
+
+    query = IDQuery( identifier, '%COO(d;C)', **kwargs )
+    _ExtractPosition(query)
+
     if query.is_main:
         if query.full or not query.parse:
             print( query() )
@@ -177,16 +726,12 @@ def Position( identifier, **kwargs ):
 
     else: return query.data
 
-def Distance( identifier, **kwargs ):
+def _ExtractDistance(query):
     """
-    Distance( identifier, **kwargs ):
-
-    Handle to the Query class with criteria='%PLX'
+    Parse an `IDQuery` with criteria='%PLX'.
     """
-    query =  IDQuery( identifier, '%PLX', **kwargs )
-
     if query.full:
-        data = query.data.split('\n')[-1]
+        return query.data.split('\n')[-1]
 
     elif query.parse:
 
@@ -195,7 +740,8 @@ def Distance( identifier, **kwargs ):
 
         if data[1] == '~':
             # nothing found!
-            raise SimbadError('No distance found for `{}`'.format(identifier))
+            raise SimbadError('No distance found for `{}`'
+                .format(query.identifier))
         try:
 
             # convert milli-arcseconds to parsecs
@@ -214,7 +760,25 @@ def Distance( identifier, **kwargs ):
 
         else: uncertainty = None
 
-    else: data = query.data
+        return result
+
+    else: return query.data
+
+    # Measurement(result, error=uncertainty, name='Distance',
+    #     notes='Retrieved from SIMBAD database for `{}`'.format(identifier))
+
+def Distance( identifier, **kwargs ):
+    """
+    Distance( identifier, **kwargs ):
+
+    Handle to the Query class with criteria='%PLX'. A list of identifiers
+    is resolved with a `BatchIDQuery`.
+    """
+    if isinstance(identifier, (list, tuple)):
+        return _Batch(identifier, '%PLX', _ExtractDistance, **kwargs)
+
+    query =  IDQuery( identifier, '%PLX', **kwargs )
+    data  = _ExtractDistance(query)
 
     if query.is_main:
         if query.full or not query.parse:
@@ -222,20 +786,12 @@ def Distance( identifier, **kwargs ):
         else:
             print( '{0:.2f}'.format( data ) )
 
-    elif not query.parse:
-        return data
-
-    else: return result
+    else: return data
 
-    # Measurement(result, error=uncertainty, name='Distance',
-    #     notes='Retrieved from SIMBAD database for `{}`'.format(identifier))
-
-def SpType(identifier, **kwargs):
+def _ExtractSpType(query):
     """
-    Handle to the Query class with criteria='%SP'.
+    Parse an `IDQuery` with criteria='%SP'.
     """
-    query = IDQuery(identifier, '%SP', **kwargs)
-
     if query.full:
         # return last full line of query
         query.data = query.data.split('\n')[-1]
@@ -244,22 +800,49 @@ def SpType(identifier, **kwargs):
         # extract relavent data
         query.data = query.data.split()[1]
 
+    return query.data
+
+def SpType(identifier, **kwargs):
+    """
+    Handle to the Query class with criteria='%SP'. A list of identifiers
+    is resolved with a `BatchIDQuery`.
+    """
+    if isinstance(identifier, (list, tuple)):
+        return _Batch(identifier, '%SP', _ExtractSpType, **kwargs)
+
+    query = IDQuery(identifier, '%SP', **kwargs)
+    _ExtractSpType(query)
+
     if query.is_main:
         print( query() )
 
     else: return query()
 
+def _ExtractIDList(query):
+    """
+    Parse an `IDQuery` with criteria='%IDLIST'.
+    """
+    if query.parse:
+        # extract relavent data
+        query.data = query.data.split(':')[-1].strip().split('\n')
+
+        if query.cache and _idcache is not None:
+            _idcache.learn(query.identifier, query.data)
+
+    return query.data
+
 def IDList(identifier, **kwargs):
     """
     Handle to the Query class with criteria='%IDLIST'.
     With `parse` = True, return a list of alternate IDs for
-    the `identifier` provided.
+    the `identifier` provided. A list of identifiers is resolved
+    with a `BatchIDQuery`.
     """
-    query = IDQuery(identifier, '%IDLIST', **kwargs)
+    if isinstance(identifier, (list, tuple)):
+        return _Batch(identifier, '%IDLIST', _ExtractIDList, **kwargs)
 
-    if query.parse:
-        # extract relavent data
-        query.data = query.data.split(':')[-1].strip().split('\n')
+    query = IDQuery(identifier, '%IDLIST', **kwargs)
+    _ExtractIDList(query)
 
     if query.is_main:
         for line in query.data:
@@ -267,36 +850,157 @@ def IDList(identifier, **kwargs):
 
     else: return query()
 
-def BVFluxes(identifier, **kwargs):
-    query= IDQuery(identifier, '%FLUXLIST(B,V;F,)',**kwargs)
+def _ExtractBVFluxes(query):
+    """
+    Parse an `IDQuery` with criteria='%FLUXLIST(B,V;F,)'.
+    """
     output=query.data.split('\n')[-1]#.split(',')
     if output == 'simbatch done':
-        return [float('NaN'),float('NaN')]
+        query.data = [float('NaN'),float('NaN')]
+        return query.data
     if query.parse:
-        b,v=query.data.split('\n')[-1].split(',')[0:2]
-        if b is '':
+        fluxes=query.data.split('\n')[-1].split(',')
+        if len(fluxes) < 2:# empty record, no fluxes
+            query.data = [float('NaN'),float('NaN')]
+            return query.data
+        b,v=fluxes[0:2]
+        if b == '':
             bf=float('NaN')
         else:
             bf=float(b)
-        if v is '':
+        if v == '':
             vf=float('NaN')
         else:
             vf=float(v)
         query.data = [bf,vf]
+    return query.data
+
+def BVFluxes(identifier, **kwargs):
+    if isinstance(identifier, (list, tuple)):
+        return _Batch(identifier, '%FLUXLIST(B,V;F,)', _ExtractBVFluxes,
+            **kwargs)
+
+    query= IDQuery(identifier, '%FLUXLIST(B,V;F,)',**kwargs)
+    _ExtractBVFluxes(query)
     if query.is_main:
         print(query())
     else:
         return query()
 
-def ObjType(identifier, **kwargs):
-    query=IDQuery(identifier, '%OTYPE(3)', **kwargs)
+def _ExtractObjType(query):
+    """
+    Parse an `IDQuery` with criteria='%OTYPE(3)'.
+    """
     if query.parse:
         query.data=query.data.split('\n')[-1]
+    return query.data
+
+def ObjType(identifier, **kwargs):
+    if isinstance(identifier, (list, tuple)):
+        return _Batch(identifier, '%OTYPE(3)', _ExtractObjType, **kwargs)
+
+    query=IDQuery(identifier, '%OTYPE(3)', **kwargs)
+    _ExtractObjType(query)
     if query.is_main:
         print(query())
     else: return query()
 
 
+# Attributes available to `Record`: name -> (format token, extraction)
+RECORD_FIELDS = {
+    'position' : ('%COO(d;C)'        , _ExtractPosition),
+    'distance' : ('%PLX'             , _ExtractDistance),
+    'sptype'   : ('%SP'              , _ExtractSpType  ),
+    'idlist'   : ('%IDLIST'          , _ExtractIDList  ),
+    'bvfluxes' : ('%FLUXLIST(B,V;F,)', _ExtractBVFluxes),
+    'objtype'  : ('%OTYPE(3)'        , _ExtractObjType )
+}
+
+class SimbadRecord:
+    """
+    SimbadRecord( identifier ):
+
+    Typed result of `Record`. Every name in `RECORD_FIELDS` is an attribute
+    holding the same value as the matching handle (e.g., `Position`), or
+    None if it was not requested. Fields SIMBAD has no value for are also
+    None, with the reason kept in `errors`.
+    """
+    def __init__(self, identifier):
+        self.identifier = identifier
+        self.errors     = {}
+        for name in RECORD_FIELDS:
+            setattr(self, name, None)
+
+    def __repr__(self):
+        return '<SimbadRecord ' + self.identifier + '>'
+
+    def __str__(self):
+        return self.identifier
+
+def RecordCriteria(fields):
+    """
+    RecordCriteria( fields ):
+
+    A single `format object` string holding the tokens of every one of
+    `fields`, each on its own line after a `::name::` delimiter.
+    """
+    for name in fields:
+        if name not in RECORD_FIELDS:
+            raise SimbadError('`{}` is not a Record field, use one of {}.'
+                .format(name, ', '.join(RECORD_FIELDS)))
+
+    return '\\n'.join([ '::{}::\\n{}'.format(name, RECORD_FIELDS[name][0])
+        for name in fields ])
+
+def _ExtractRecord(query, **kwargs):
+    """
+    Split an `IDQuery` with criteria from `RecordCriteria` into its fields
+    and parse each with the extraction of the matching handle.
+    """
+    record = SimbadRecord(query.identifier)
+    rule, *parts = re.split(r'::(\w+)::', query.data)
+
+    for name, text in zip(parts[0::2], parts[1::2]):
+        criteria, extract = RECORD_FIELDS[name]
+        try:
+            field = IDQuery(query.identifier, criteria,
+                response=rule + text.strip(), **kwargs)
+            setattr(record, name, extract(field))
+
+        except (SimbadError, ValueError, IndexError) as err:
+            record.errors[name] = err
+
+    query.data = record
+    return record
+
+def Record(identifier, fields=None, **kwargs):
+    """
+    Record( identifier, fields=None, **kwargs ):
+
+    Retrieve several attributes of `identifier` (all of `RECORD_FIELDS` by
+    default) with a single query and return them as a `SimbadRecord`.
+    A list of identifiers is resolved with a `BatchIDQuery`, giving one
+    request per `chunk` identifiers for every field at once.
+    """
+    if fields is None:
+        fields = list(RECORD_FIELDS)
+
+    criteria = RecordCriteria(fields)
+    if isinstance(identifier, (list, tuple)):
+        options = { key: value for key, value in kwargs.items()
+            if key not in ('chunk', 'deadline') }
+        return _Batch(identifier, criteria,
+            lambda query: _ExtractRecord(query, **options), **kwargs)
+
+    query = IDQuery(identifier, criteria, **kwargs)
+    _ExtractRecord(query, **kwargs)
+
+    if query.is_main:
+        for name in fields:
+            print('{:<10} {}'.format(name, getattr(query.data, name)))
+
+    else: return query()
+
 
 #List based queries built around Simbad's criteria searches
 #CoordSearch and CritSearch returns lists of objects
@@ -322,44 +1026,174 @@ def CritURLEncoded(url):
         for character in list(url)])
 
 
-# Would like to add options to this to choose returned output.
-# Being able to select proper motions, parallaxes, etc would be nice
-def CritScript(critstring, outputmode='list', mx=100, get_fluxes=True, get_pms=False, get_plx=False):
+# sim-sam switches selecting the columns of a list, by the attribute
+# names of SimbadObject (or a group of them)
+LIST_COLUMNS = OrderedDict([
+    ('objecttype'  , ('list.otypesel', ())),
+    ('coords'      , ('list.coo1'    , ('ra', 'dec'))),
+    ('pm'          , ('list.pmsel'   , ('pm_ra', 'pm_dec'))),
+    ('plx'         , ('list.plxsel'  , ())),
+    ('fluxes'      , ('list.fluxsel' , ('umag', 'bmag', 'vmag', 'rmag', 'imag'))),
+    ('spectraltype', ('list.spsel'   , ()))
+])
+
+# switch of each magnitude band
+LIST_BANDS = OrderedDict([ ('umag', 'U'), ('bmag', 'B'), ('vmag', 'V'),
+    ('rmag', 'R'), ('imag', 'I') ])
+
+def SelectColumns(columns):
+    """
+    Attribute names of SimbadObject for `columns` (attribute names or the
+    groups of LIST_COLUMNS), always including the identifier.
+    """
+    selected = {'identifier'}
+    for column in columns:
+        if column in LIST_COLUMNS:
+            members = LIST_COLUMNS[column][1]
+            selected.update(members if members else (column,))
+        elif column in ('identifier',) or any( column in members
+            for switch, members in LIST_COLUMNS.values() ):
+            selected.add(column)
+        else:
+            raise SimbadError('`{}` is not a column of SIMBAD lists.'
+                .format(column))
+    return selected
+
+def ListSelection(columns):
+    """
+    Switches of a sim-sam list for `columns` (see `SelectColumns`). The
+    identifier is always listed; every other column is left out unless
+    selected.
+    """
+    selected = SelectColumns(columns)
+    switches = []
+    for name, (switch, members) in LIST_COLUMNS.items():
+        members = members if members else (name,)
+        switches.append('&{}={}'.format(switch,
+            'on' if selected.intersection(members) else 'off'))
+    switches += [ '&{}={}'.format(band, 'on' if attr in selected else 'off')
+        for attr, band in LIST_BANDS.items() ]
+    return ''.join(switches)
+
+def _FlagColumns(get_fluxes, get_pms, get_plx, get_coords, get_spec_type):
+    """
+    Columns selected by the `get_*` flags (fluxes are the B and V
+    magnitudes).
+    """
+    columns = ['objecttype']
+    columns += ['coords'] if get_coords else []
+    columns += ['bmag', 'vmag'] if get_fluxes else []
+    columns += ['pm'] if get_pms else []
+    columns += ['plx'] if get_plx else []
+    columns += ['spectraltype'] if get_spec_type else []
+    return columns
+
+def CritScript(critstring, outputmode='list', mx=100, get_fluxes=True,
+    get_pms=False, get_plx=False, get_coords=True, get_spec_type=True,
+    columns=None):
+    """
+    URL of a sim-sam criteria query. Unless `columns` are given (see
+    `ListSelection`), the `get_*` flags select the columns of the list
+    (fluxes are the B and V magnitudes).
+    """
     mx = int(mx)
     if outputmode.upper() not in ('LIST','COUNT'):
         raise SimbadError('Output mode must be LIST or COUNT!')
 
+    if columns is None:
+        columns = _FlagColumns(get_fluxes, get_pms, get_plx, get_coords,
+            get_spec_type)
+
     script = [
         'http://simbad.u-strasbg.fr/simbad/sim-sam?',
         'output.format=ASCII&list.idopt=CATLIST&list.idcat=HD', #select HD cat names
         '&list.bibsel=off&list.notesel=off&obj.bibsel=off&obj.notesel=off', #hide bib and notes
+        '&list.rvsel=off&list.mtsel=off&list.sizesel=off', #hide other measurements
         '&coodisp1=[d][2]',#coordinate output format
         '&Criteria=',CritURLEncoded(critstring),
-        '&OutputMode=',outputmode,'&maxObject=',str(mx)]
-    if get_fluxes:
-        script.append('&list.fluxsel=on&U=off&R=off&B=on&V=on') #format list flux/mag display
-    else:
-        script.append('&list.fluxsel=off')
-    if get_pms:
-        script.append('&list.pmsel=on')
-    else:
-        script.append('&list.pmsel=off')
-    if get_plx:
-        script.append('&list.plxsel=on')
-    else:
-        script.append('&list.plxsel=off')
+        '&OutputMode=',outputmode,'&maxObject=',str(mx),
+        ListSelection(columns)]
 
     return ''.join(script)
 
-class CritQuery:
-        """
-        CritQuery( critstring, **kwargs ):
-
-        Class for querying the SIMBAD astronomical database for 'criteria'
-
+# VOTable fields of a sim-script query and the columns they come back as,
+# by the attribute names of SimbadObject
+VOTABLE_FIELDS = OrderedDict([
+    ('identifier'  , ('main_id' , 'MAIN_ID')),
+    ('objecttype'  , ('otype'   , 'OTYPE')),
+    ('ra'          , ('ra(d)'   , 'RA_d')),
+    ('dec'         , ('dec(d)'  , 'DEC_d')),
+    ('pm_ra'       , ('pmra'    , 'PMRA')),
+    ('pm_dec'      , ('pmdec'   , 'PMDEC')),
+    ('plx'         , ('plx'     , 'PLX_VALUE')),
+    ('umag'        , ('flux(U)' , 'FLUX_U')),
+    ('bmag'        , ('flux(B)' , 'FLUX_B')),
+    ('vmag'        , ('flux(V)' , 'FLUX_V')),
+    ('rmag'        , ('flux(R)' , 'FLUX_R')),
+    ('imag'        , ('flux(I)' , 'FLUX_I')),
+    ('spectraltype', ('sp'      , 'SP_TYPE'))
+])
+
+def VOTableScript(critstring, mx=100, columns=None):
+    """
+    URL of a sim-script criteria query returning a VOTable of `columns`
+    (see `SelectColumns`, all of them by default).
+    """
+    selected = SelectColumns(VOTABLE_FIELDS if columns is None else columns)
+    fields   = ','.join( field for attr, (field, name)
+        in VOTABLE_FIELDS.items() if attr in selected )
+
+    script = '\n'.join([
+        'output console=off script=off',
+        'set limit {}'.format(int(mx)),
+        'votable {{{}}}'.format(fields),
+        'votable open',
+        'query sample {}'.format(critstring),
+        'votable close' ])
+
+    return ('http://simbad.u-strasbg.fr/simbad/sim-script?' +
+        urlencode({'script': script}))
+
+def _DecodeVOTable(body, start=0):
+    """
+    `SimbadTable` of the VOTable in `body` (bytes) from offset `start`,
+    decoded column by column (any serialization, TABLEDATA, BINARY or
+    BINARY2).
+    """
+    try:
+        votable = parse_votable(BytesIO(memoryview(body)[start:]),
+            verify='ignore')
+        array   = votable.get_first_table().array
+    except (ValueError, IndexError) as error:
+        raise SimbadError('Failed to decode the VOTable from SIMBAD: {}'
+            .format(error))
+    columns = {}
+    for attr, (field, name) in VOTABLE_FIELDS.items():
+        if name not in array.dtype.names:
+            continue
+        column = array[name]
+        if attr in SimbadTable.FLOATS:
+            column = np.ma.filled(column.astype(np.float64), np.nan)
+        else:
+            data = np.ma.getdata(column)
+            if data.dtype.kind == 'S':
+                data = np.char.decode(data, 'utf-8')
+            column = np.where(np.ma.getmaskarray(column), '',
+                data.astype(str))
+        columns[attr] = column
+    return SimbadTable.from_arrays(columns, len(array))
+
+class CritQuery:
+        """
+        CritQuery( critstring, **kwargs ):
+
+        Class for querying the SIMBAD astronomical database for 'criteria'
+
         kwargs = {
             'parse' : True,  # extract relavent data from SIMBAD return file
             'dtype' : float, # output datatype
+            'stream': False, # read the return file lazily with `lines()`
+            'format': 'ascii', # or 'votable', decoded with `table()`
         }
         """
         def __init__(self, criteria, default=float, **kwargs):
@@ -371,6 +1205,9 @@ class CritQuery:
                 raise SimbadError('Simbad.Query function expects str'
                 'types for arguments.')
 
+            # not an `Options` keyword
+            transport = GetTransport( kwargs.pop('transport', None) )
+
             try:
                 # keyword argument options for Query
                 self.options = Options( kwargs,
@@ -379,13 +1216,18 @@ class CritQuery:
                         'full'   : False   , # return full line of info
                         'dtype'  : default , # convert return data
                         'is_main': False   , # called from Main()
+                        'cache'  : True    , # use the transport's cache
+                        'deadline': 0.0    , # seconds allowed (0 for none)
                         'mode'   : 'LIST'  , # Output mode
                         'mx'     : 100,       # Max number to return
                         'get_coords'   : True,
                         'get_fluxes'   : True,
                         'get_pms'      : False,
                         'get_plx'      : False,
-                        'get_spec_type': True
+                        'get_spec_type': True,
+                        'columns': []      , # columns listed (see CritScript)
+                        'stream' : False   , # read lazily with lines()
+                        'format' : 'ascii'   # or 'votable'
                     })
 
                 # assignments
@@ -393,17 +1235,48 @@ class CritQuery:
                 self.full    = self.options('full')
                 self.dtype   = self.options('dtype')
                 self.is_main = self.options('is_main')
+                self.cache   = self.options('cache')
+                self.deadline = Deadline(self.options('deadline'))
                 self.mode    = self.options('mode')
                 self.mx      = self.options('mx')
+                self.stream  = self.options('stream')
                 flx          = self.options('get_fluxes')
                 pms          = self.options('get_pms')
                 plx          = self.options('get_plx')
+                coo          = self.options('get_coords')
+                spt          = self.options('get_spec_type')
+                columns      = self.options('columns') or None
+                self.format  = self.options('format').lower()
+                if self.format not in ('ascii', 'votable'):
+                    raise SimbadError('Output format must be ascii or '
+                        'votable!')
                 # query SIMBAD database
                 #with urlopen( Script(identifier, criteria) ) as response:
                 #    self.data = str( response.read().decode('utf-8') ).strip()
-                url=CritScript(criteria, self.mode, self.mx, flx,pms,plx)
-                response = urlopen( url )
-                self.data = str( response.read().decode('utf-8')).strip()
+                url=CritScript(criteria, self.mode, self.mx, flx,pms,plx,
+                    coo, spt, columns)
+                if self.format == 'votable' and self.mode.upper() == 'LIST':
+                    # the VOTable is kept as it came back, see `table()`
+                    self.stream = False
+                    response = transport.request( VOTableScript(criteria,
+                        self.mx, columns if columns is not None else
+                        _FlagColumns(flx, pms, plx, coo, spt)),
+                        cache=self.cache, deadline=self.deadline )
+                    self.stale = getattr(response, 'stale', False)
+                    self.data  = response.read()
+                    return
+                if self.stream:
+                    # nothing is sent until `lines()` is iterated
+                    self.url, self.transport = url, transport
+                    self.stale, self.data = False, None
+                    return
+                response = transport.request( url, cache=self.cache,
+                    negative=_Unresolved, deadline=self.deadline )
+                self.stale = getattr(response, 'stale', False)
+                # errors are reported above the list header (or the data of
+                # a single object page); only the data is decoded
+                payload = Payload(response.read(), heads=(b'\n#|',),
+                    parse=self.parse)
 
             except OptionsError as err:
                 print('\n --> OptionsError:', err.msg )
@@ -412,12 +1285,10 @@ class CritQuery:
             except URLError as error:
                 raise SimbadError('Failed to contact SIMBAD database')
 
-            if 'not found' in self.data or 'error' in self.data:
+            if payload.reports(b'not found', b'error'):
                 raise SimbadError('could not be resolved by SIMBAD.')
 
-            if self.parse:
-                # pre-parse operation common to all criteria
-                self.data = self.data.split('data')[-1]
+            self.data = payload.text()
 
         def __call__(self):
             """
@@ -425,17 +1296,113 @@ class CritQuery:
             """
             return self.data
 
+        def table(self):
+            """
+            `SimbadTable` of the VOTable returned (with `format` 'votable').
+            """
+            # anything else is an error report of the script
+            payload = Payload(self.data, heads=(b'<VOTABLE',), parse=False)
+            if payload.head == payload.end:
+                if payload.reports(b'No astronomical object found'):
+                    return SimbadTable.from_arrays({}, 0)
+                raise SimbadError('could not be resolved by SIMBAD.')
+
+            # the document starts at its XML declaration (if any), after
+            # the section banner of the script
+            start = self.data.rfind(b'<?xml', payload.start, payload.head)
+            return _DecodeVOTable(self.data, payload.head if start < 0
+                else start)
+
+        def lines(self):
+            """
+            Lines of the return file, as they arrive from SIMBAD (with
+            `stream` set).
+            """
+            if not self.stream:
+                yield from self.data.split('\n')
+                return
+
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            tail    = ''
+            try:
+                for chunk in self.transport.stream( self.url, cache=self.cache,
+                    negative=_Unresolved, deadline=self.deadline ):
+                    lines = (tail + decoder.decode(chunk)).split('\n')
+                    tail  = lines.pop()
+                    yield from lines
+
+            except URLError as error:
+                raise SimbadError('Failed to contact SIMBAD database')
+
+            tail += decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+
+def _CircleCriteria(lng, lat, rad, radunit, frame):
+    # criteria string of a cone search
+    #Lat must be preceded by sign
+    if lat >= 0:
+        lat='+'+str(lat)
+
+    critstring=['region(circle,', frame, ',',
+        str(lng),' ',str(lat),',',str(rad),radunit,')']
+    return ''.join(critstring)
+
+# latitude field of the criteria for each frame (for tiling)
+FRAME_LATITUDES = { 'icrs': 'dec', 'fk5': 'dec', 'gal': 'glat' }
+
+def _TiledSearch(lng, lat, rad, radunit, frame, tile, workers, kwargs):
+    # Cone search split in declination strips of height `tile`, each the
+    # circle ANDed with a latitude range, searched in parallel (paced by the
+    # transport) and merged without duplicates
+    field=FRAME_LATITUDES.get(frame.lower())
+    if field is None:
+        raise SimbadError('Tiled searches support the frames {}.'
+            .format(', '.join(sorted(FRAME_LATITUDES))))
+
+    scale={'d': 1.0, 'm': 60.0, 's': 3600.0}[radunit]
+    radius, height=float(rad) / scale, float(tile) / scale
+    low, high=max(-90.0, lat - radius), min(90.0, lat + radius)
+    count=max(1, int(np.ceil((high - low) / height)))
+    edges=np.linspace(low, high, count + 1)
+
+    circle=_CircleCriteria(lng, lat, rad, radunit, frame)
+    strips=[ '{} & {} >= {:.9f} & {} {} {:.9f}'.format(circle, field, edges[i],
+        field, '<=' if i == count - 1 else '<', edges[i+1])
+        for i in range(count) ]
+
+    mx=int(kwargs.get('mx', 100))
+    results=_SearchParts(strips, workers, kwargs)
+
+    # a strip that filled `mx` rows may have been cut short
+    merged=_MergeResults(results, _TableResult(kwargs))
+    merged.truncated=[ strip for strip, result in zip(strips, results)
+        if len(result) >= mx ]
+    return merged
+
 def CoordSearch(lng,lat,rad,**kwargs):
+    # options specific to CoordSearch, the rest are passed to CritQuery
+    coord_kwargs={key: kwargs.pop(key)
+        for key in ('frame','radunit','fulldata','table','lazy','tile','workers')
+        if key in kwargs}
     try:
-        opts=Options(kwargs,
+        opts=Options(coord_kwargs,
             {
                 'frame'   : 'icrs',
                 'radunit' : 'm',
-                'fulldata': False
+                'fulldata': False,
+                'table'   : False, # return a SimbadTable
+                'lazy'    : False, # decode object fields on access
+                'tile'    : 0.0  , # height of declination strips (radunit)
+                'workers' : 8      # strips searched at once
             })
         frame=opts('frame')
         radunit=opts('radunit')
         fulldata=opts('fulldata')
+        table=opts('table')
+        lazy=opts('lazy')
+        tile=opts('tile')
+        workers=opts('workers')
     except OptionsError as err:
         print('\n --> OptionsError:', err.msg )
         raise SimbadError('Simbad.Query was not constructed')
@@ -444,13 +1411,20 @@ def CoordSearch(lng,lat,rad,**kwargs):
     if radunit not in ('d','m','s'):
         raise SimbadError('Unit of radius must be one of d,m,s!')
 
-    #Lat must be preceded by sign
-    if lat >= 0:
-        lat='+'+str(lat)
-
-    critstring=['region(circle,', frame, ',',
-        str(lng),' ',str(lat),',',str(rad),radunit,')']
-    query=CritQuery(''.join(critstring), **kwargs)
+    if tile > 0:
+        if fulldata:
+            raise SimbadError('fulldata is not available for tiled searches.')
+        return _TiledSearch(lng, lat, rad, radunit, frame, tile, workers,
+            dict(kwargs, table=table, lazy=lazy))
+
+    query=CritQuery(_CircleCriteria(lng, lat, rad, radunit, frame), **kwargs)
+    if query.format == 'votable':
+        return query() if fulldata else query.table()
+    if table and not fulldata:
+        return SimbadTable.build(_stream_list_to_objects(query))
+    if query.stream:
+        return query.lines() if fulldata else _stream_list_to_objects(query,
+            lazy)
     if fulldata:
         return query()
     else:
@@ -459,12 +1433,156 @@ def CoordSearch(lng,lat,rad,**kwargs):
             return []
         if (len(query.data) > 1):# >0 returned
             if query.data[5].split(' ')[0] == 'Number':# >1 returned as list, strip object names from list entries
-                return _convert_list_to_objects(query)
+                return _convert_list_to_objects(query, lazy)
             else:# 1 item return as object(instead of list), need to strip object name from data
                 return _convert_page_data_to_object(query)
 
 
 
+_NAN      = float('nan')
+_NAN_PAIR = (_NAN, _NAN)
+_MISSING  = frozenset(('~', ''))
+
+def _Number(text):
+    """
+    Float value of a list entry ('~' or blank for missing values).
+    """
+    text = text.strip()
+    return _NAN if text in _MISSING else float(text)
+
+def _Identifier(text):
+    """
+    Identifier of a list entry (without the trailing columns of names).
+    """
+    return text.strip().split('  ')[0]
+
+def _Pair(text):
+    """
+    Two float values of a list entry (coordinates, proper motions).
+    """
+    values = text.split()
+    if len(values) < 2 or '~' in values[:2]:
+        return _NAN_PAIR
+    return float(values[0]), float(values[1])
+
+class ListExtractor:
+    """
+    ListExtractor( header ):
+
+    Header of a SIMBAD list compiled once into column positions and
+    converters, to be applied to every row of the list. Columns are found
+    by name, so they may come in any order and all but the identifier may
+    be left out (see `ListSelection`).
+    """
+    MAGS = (('umag', 'Mag U'), ('bmag', 'Mag B'), ('vmag', 'Mag V'),
+        ('rmag', 'Mag R'), ('imag', 'Mag I'))
+
+    def __init__(self, header):
+        hdrs = [x.strip() for x in header.split('|')]
+        find = lambda prefix: next((i for i, name in enumerate(hdrs)
+            if name.startswith(prefix)), None)
+
+        # attribute -> (column, converter, attributes it gives); columns
+        # not listed have no position and give NaN (or '' for text)
+        pairs = { 'coords': (('ra', 'dec'), find('coord')),
+            'pm': (('pm_ra', 'pm_dec'), hdrs.index('pm') if 'pm' in hdrs
+            else None) }
+        self.decoders = {
+            'identifier'   : (find('ident') or 1, _Identifier, None),
+            'objecttype'   : (find('typ'), str.strip, None),
+            'spectraltype' : (find('spec'), str.strip, None),
+            'plx'          : (hdrs.index('plx') if 'plx' in hdrs else None,
+                _Number, None) }
+        self.decoders.update({ attr: (hdrs.index(name) if name in hdrs
+            else None, _Number, None) for attr, name in self.MAGS })
+        for pair, index in pairs.values():
+            self.decoders.update({ attr: (index, _Pair, pair)
+                for attr in pair })
+
+        # decoded together for every row, missing ones are constant
+        self.columns = [ (attr, index, convert) for attr, (index, convert,
+            pair) in self.decoders.items() if index is not None and
+            pair is None ]
+        self.pairs   = [ (pair, index) for pair, index in pairs.values()
+            if index is not None ]
+        self.blank   = {}
+        for attr, (index, convert, pair) in self.decoders.items():
+            if index is None:
+                self.blank[attr] = '' if convert is str.strip else _NAN
+        self.coords  = pairs['coords'][1]
+
+    def fields(self, row):
+        """
+        Attributes of a `SimbadObject` for the list entry `row`.
+        """
+        data   = row.split('|')
+        fields = { attr: convert(data[index]) for attr, index, convert
+            in self.columns }
+        for pair, index in self.pairs:
+            fields[pair[0]], fields[pair[1]] = _Pair(data[index])
+        if self.blank:
+            fields.update(self.blank)
+        return fields
+
+    def __call__(self, row):
+        """
+        `SimbadObject` for the list entry `row`.
+        """
+        obj = SimbadObject.__new__(SimbadObject)
+        obj.__dict__ = self.fields(row)
+        return obj
+
+    def lazy(self, row):
+        """
+        `SimbadObject` for the list entry `row` whose attributes are only
+        decoded when first read (see `decode`).
+        """
+        obj = SimbadObject.__new__(SimbadObject)
+        obj.__dict__ = { '_row': row, '_extract': self }
+        return obj
+
+    def decode(self, fields, name):
+        """
+        Decode attribute `name` of a lazy object from its raw row, keeping
+        the value (and the other of a pair) in `fields`.
+        """
+        if name not in self.decoders:
+            raise AttributeError(name)
+
+        data = fields.get('_data')
+        if data is None:
+            # the fields nearly every caller reads are decoded at once
+            data = fields['_data'] = fields.pop('_row').split('|')
+            fields['identifier'] = _Identifier(data[self.decoders[
+                'identifier'][0]])
+            fields['ra'], fields['dec'] = ( _NAN_PAIR if self.coords is None
+                else _Pair(data[self.coords]) )
+            if name in fields:
+                return fields[name]
+
+        index, convert, pair = self.decoders[name]
+        if index is None:
+            fields[name] = self.blank[name]
+        elif pair is None:
+            fields[name] = convert(data[index])
+        else:
+            fields[pair[0]], fields[pair[1]] = convert(data[index])
+        return fields[name]
+
+# compiled headers, by header line
+_extractors = {}
+
+def CompileHeader(header):
+    """
+    The `ListExtractor` for a SIMBAD list `header` (compiled once).
+    """
+    extractor = _extractors.get(header)
+    if extractor is None:
+        if len(_extractors) >= 64:
+            _extractors.clear()
+        extractor = _extractors[header] = ListExtractor(header)
+    return extractor
+
 class SimbadObject():
     def __init__(self,list_info_string='', list_header=''):
         if list_info_string=='' and list_header=='':
@@ -482,56 +1600,15 @@ class SimbadObject():
             self.imag=float('nan')
             self.spectraltype=''
             return
-        data=[x.strip() for x in list_info_string.split('|')]
-        hdrs=[x.strip() for x in list_header.split('|')]
-        coord_string=data[3]
-        self.identifier=data[1].split('  ')[0]
-        self.objecttype=data[2]
-        self.ra=float(coord_string.split(' ')[0])
-        self.dec=float(coord_string.split(' ')[1])
-        if 'pm' in hdrs and ('~' not in data[hdrs.index('pm')]):
-            pms=[x.strip() for x in data[hdrs.index('pm')].split(' ')]
-            self.pm_ra = float(pms[0])
-            self.pm_dec= float(pms[1])
-        else:
-            self.pm_ra = float('nan')
-            self.pm_dec= float('nan')
-
-        if ('plx' in hdrs) and data[hdrs.index('plx')] != '~':
-            self.plx=float(data[hdrs.index('plx')])
-        else:
-            self.plx=float('nan')
-
-        if 'Mag V' in hdrs:
-            mag_start_idx=hdrs.index('Mag U')
-            if data[mag_start_idx] == '~':
-                self.umag=float('nan')
-            else:
-                self.umag=float(data[mag_start_idx])
-            if data[mag_start_idx+1] == '~':
-                self.bmag=float('nan')
-            else:
-                self.bmag=float(data[mag_start_idx+1])
-            if data[mag_start_idx+2] == '~':
-                self.vmag=float('nan')
-            else:
-                self.vmag=float(data[mag_start_idx+2])
-            if data[mag_start_idx+3] == '~':
-                self.imag=float('nan')
-            else:
-                self.imag=float(data[mag_start_idx+3])
-            if data[mag_start_idx+4] == '~':
-                self.rmag=float('nan')
-            else:
-                self.rmag=float(data[mag_start_idx+4])
-        else:
-            self.umag=float('nan')
-            self.bmag=float('nan')
-            self.vmag=float('nan')
-            self.imag=float('nan')
-            self.rmag=float('nan')
+        self.__dict__.update(
+            CompileHeader(list_header).fields(list_info_string))
 
-        self.spectraltype=data[-1]
+    def __getattr__(self, name):
+        # only reached for attributes not decoded yet (lazy objects)
+        fields = self.__dict__
+        if '_extract' not in fields:
+            raise AttributeError(name)
+        return fields['_extract'].decode(fields, name)
 
     # Function to parse the special case of Simbad returning a single item page
     # instead of a list of results
@@ -587,28 +1664,259 @@ class SimbadObject():
     def __str__(self):
         return self.identifier
 
+class Categorical:
+    """
+    Categorical( values ):
+
+    Column of repeated strings stored as integer codes into the list of
+    distinct values (`categories`).
+    """
+    def __init__(self, codes, categories):
+        self.codes      = codes
+        self.categories = categories
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Categorical(self.codes[index], self.categories)
+        return self.categories[ self.codes[index] ]
+
+    def to_numpy(self):
+        """
+        The strings as a NumPy object array.
+        """
+        return np.array(self.categories, dtype=object)[self.codes]
+
+class Strings:
+    """
+    Strings( data, offsets ):
+
+    Column of distinct strings stored as one UTF-8 buffer and the offset
+    of each string in it.
+    """
+    def __init__(self, data, offsets):
+        self.data    = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                raise SimbadError('Strings columns only support contiguous '
+                    'slices.')
+            return Strings(self.data, self.offsets[start:max(start, stop)+1])
+        if index < 0:
+            index += len(self)
+        return self.data[ self.offsets[index]:self.offsets[index+1] ].decode(
+            'utf-8')
+
+    def to_numpy(self):
+        """
+        The strings as a NumPy object array.
+        """
+        return np.array([ self[i] for i in range(len(self)) ], dtype=object)
+
+class SimbadRow:
+    """
+    Lightweight view of one row of a `SimbadTable`, with the attributes of
+    a `SimbadObject`.
+    """
+    __slots__ = ('table', 'index')
+
+    def __init__(self, table, index):
+        self.table = table
+        self.index = index
+
+    def __getattr__(self, name):
+        if name in SimbadTable.COLUMNS:
+            return self.table.columns[name][self.index]
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return self.identifier
+    def __str__(self):
+        return self.identifier
+
+class SimbadTable:
+    """
+    SimbadTable( columns ):
+
+    Columnar result of a list search. Coordinates, proper motions,
+    parallaxes and magnitudes are NumPy float64 arrays; identifiers are
+    kept as `Strings` and object and spectral types as `Categorical`.
+    Indexing with a column name returns the column (the arrays themselves,
+    not copies), with an integer a `SimbadRow` view.
+    """
+    FLOATS  = ('ra', 'dec', 'pm_ra', 'pm_dec', 'plx', 'umag', 'bmag', 'vmag',
+        'rmag', 'imag')
+    CATEGORICAL = ('objecttype', 'spectraltype')
+    COLUMNS = ('identifier',) + CATEGORICAL + FLOATS
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def build(cls, objects):
+        """
+        Table of `objects` (SimbadObjects, any iterable), consumed one at
+        a time so the objects themselves need not be kept.
+        """
+        floats  = { name: array('d') for name in cls.FLOATS }
+        codes   = { name: array('i') for name in cls.CATEGORICAL }
+        lookup  = { name: {} for name in cls.CATEGORICAL }
+        data    = bytearray()
+        offsets = array('q', [0])
+
+        for obj in objects:
+            fields = obj.__dict__
+            if '_extract' in fields:
+                fields = { name: getattr(obj, name) for name in cls.COLUMNS }
+            for name, column in floats.items():
+                column.append( fields.get(name, _NAN) )
+            for name, column in codes.items():
+                value = fields.get(name, '')
+                column.append( lookup[name].setdefault(value,
+                    len(lookup[name])) )
+            data += fields.get('identifier', '').encode('utf-8')
+            offsets.append( len(data) )
+
+        # arrays share the buffers filled above
+        columns = { name: np.frombuffer(column, dtype=np.float64)
+            for name, column in floats.items() }
+        columns.update({ name: Categorical(np.frombuffer(codes[name],
+            dtype=np.intc), list(lookup[name])) for name in cls.CATEGORICAL })
+        columns['identifier'] = Strings(bytes(data),
+            np.frombuffer(offsets, dtype=np.int64))
+        return cls(columns)
+
+    @classmethod
+    def from_arrays(cls, arrays, length):
+        """
+        Table of `length` rows from columns given as arrays (or
+        sequences), by attribute name. Columns not given are NaN or ''.
+        """
+        columns = { name: np.ascontiguousarray(arrays[name], dtype=np.float64)
+            if name in arrays else np.full(length, np.nan)
+            for name in cls.FLOATS }
+
+        for name in cls.CATEGORICAL:
+            if name in arrays:
+                categories, codes = np.unique(np.asarray(arrays[name],
+                    dtype=str), return_inverse=True)
+                columns[name] = Categorical(codes.astype(np.intc).ravel(),
+                    categories.tolist())
+            else:
+                columns[name] = Categorical(np.zeros(length, dtype=np.intc),
+                    [''])
+
+        identifiers = [ str(identifier).encode('utf-8') for identifier
+            in arrays.get('identifier', [''] * length) ]
+        offsets = np.zeros(length + 1, dtype=np.int64)
+        np.cumsum([ len(identifier) for identifier in identifiers ],
+            out=offsets[1:])
+        columns['identifier'] = Strings(b''.join(identifiers), offsets)
+        return cls(columns)
+
+    def __len__(self):
+        return len(self.columns['ra'])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, slice):
+            return SimbadTable({ name: column[key] for name, column
+                in self.columns.items() })
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError('SimbadTable index out of range')
+        return SimbadRow(self, key)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield SimbadRow(self, index)
+
+    def to_numpy(self, names=None):
+        """
+        Dictionary of NumPy arrays for the columns `names` (all by
+        default). Float columns are returned without copying.
+        """
+        names = self.COLUMNS if names is None else names
+        return { name: self.columns[name] if name in self.FLOATS else
+            self.columns[name].to_numpy() for name in names }
+
+    def to_objects(self):
+        """
+        List of `SimbadObject`s, as returned without `table`.
+        """
+        columns = { name: self.columns[name].tolist() if name in self.FLOATS
+            else self.columns[name] for name in self.COLUMNS }
+        objects = []
+        for index in range(len(self)):
+            obj = SimbadObject.__new__(SimbadObject)
+            obj.__dict__ = { name: column[index] for name, column
+                in columns.items() }
+            objects.append(obj)
+        return objects
+
 #If mode='COUNT', return integer number of hits
 #If mode='LIST', returns list of identifiers
+#With stream=True, LIST mode returns a generator of SimbadObjects instead
+#With table=True, LIST mode returns a SimbadTable instead
+#With lazy=True, object fields are only decoded when first read
+#With format='votable', LIST mode returns a SimbadTable decoded from VOTable
+#With partition=True, LIST mode splits criteria matching more than mx
+#objects (by COUNT) and merges the parts, searched by `workers` at once
 def CritSearch(critstring, **kwargs):
+    # not CritQuery keywords
+    table=kwargs.pop('table', False)
+    lazy=kwargs.pop('lazy', False)
+    partition=kwargs.pop('partition', False)
+    workers=kwargs.pop('workers', 8)
+    if partition and str(kwargs.get('mode', 'LIST')).upper()!='COUNT':
+        if kwargs.get('full', False):
+            raise SimbadError('full is not available for partitioned searches.')
+        return _PartitionedSearch(critstring, workers,
+            dict(kwargs, table=table, lazy=lazy))
     query=CritQuery(critstring, **kwargs)
     try:
-        opts=Options(kwargs,
+        opts=Options({key: value for key, value in kwargs.items()
+            if key != 'transport'},
             {
                 'mx'       : 100,
                 'mode'     :'LIST',
                 'full'     : False,
+                'cache'    : True,
+                'deadline' : 0.0,
                 'get_coords'   : True,
                 'get_fluxes'   : True,
                 'get_pms'      : False,
                 'get_plx'      : False,
-                'get_spec_type': True
+                'get_spec_type': True,
+                'columns'      : [],
+                'stream'       : False,
+                'format'       : 'ascii'
             })
         mode=opts('mode').upper()
         fulldata=opts('full')
     except URLError as error:
         raise SimbadError('Failed to contact SIMBAD database for')
+    if query.format == 'votable' and mode!='COUNT':
+        return query() if fulldata else query.table()
+    if table and mode!='COUNT' and not fulldata:
+        return SimbadTable.build(_stream_list_to_objects(query))
+    if query.stream and mode!='COUNT':
+        return query.lines() if fulldata else _stream_list_to_objects(query,
+            lazy)
     if mode=='COUNT':
-        return query.data.split('=')[1].strip()
+        if query.stream:
+            query.data=''.join(query.lines()).strip()
+        return _ParseCount(query.data)
     if fulldata:
         return query()
     else:
@@ -617,28 +1925,989 @@ def CritSearch(critstring, **kwargs):
             return []
         if (len(query.data) > 1):# >0 returned
             if query.data[5].split(' ')[0] == 'Number':# >1 returned as list, strip object names from list entries
-                return _convert_list_to_objects(query)
+                return _convert_list_to_objects(query, lazy)
             else:# 1 item return as object(instead of list), need to strip object name from data
                 return [_convert_page_data_to_object(query)]
 
-def _convert_list_to_objects(query):
+# count line of a COUNT answer ('Number of objects = N')
+COUNT_LINE = re.compile(r'^[^=:\n]*number[^=:\n]*[=:][ \t]*(\d+)[ \t]*$',
+    re.IGNORECASE | re.MULTILINE)
+
+def _ParseCount(data):
+    # Number of objects in a COUNT answer, as a string. The head echoes the
+    # criteria, which may contain '=' (e.g., 'ra >= 10'), so only the count
+    # line is read, or else the text after the last '=' of the last line
+    # that has one
+    match=COUNT_LINE.search(data)
+    if match is not None:
+        return match.group(1)
+    lines=[ line for line in data.split('\n') if '=' in line ]
+    if not lines:
+        raise SimbadError('SIMBAD returned no count.')
+    return lines[-1].rsplit('=', 1)[1].strip()
+
+def _convert_list_to_objects(query, lazy=False):
     # Converts a returned query that contains a list of objects
-    # into a list of SimbadObjects
-    header=query.data[7]
+    # into a list of SimbadObjects (decoded on access if lazy)
+    extract=CompileHeader(query.data[7])
+    extract=extract.lazy if lazy else extract
     lst=[]
     for entry in query.data:
         if (len(entry) >0) and (entry[0].isdigit()):
             #lst.append(entry.split('|')[1].split('  ')[0])
-            lst.append(SimbadObject(entry, header))
+            lst.append(extract(entry))
     query.data=lst
     return query()
 
+def _stream_list_to_objects(query, lazy=False):
+    # Generator counterpart of _convert_list_to_objects: rows are parsed
+    # into SimbadObjects as they arrive, so memory does not grow with the
+    # number of objects
+    lines=query.lines()
+    head=[]
+    for line in lines:
+        if head or line.strip():
+            head.append(line)
+        if len(head) == 8:
+            break
+    if any('not found' in line or 'error' in line for line in head):
+        raise SimbadError('could not be resolved by SIMBAD.')
+
+    if len(head) > 5 and head[5].split(' ')[0] == 'Number':# list of objects
+        extract=CompileHeader(head[7])
+        extract=extract.lazy if lazy else extract
+        for entry in lines:
+            if (len(entry) >0) and (entry[0].isdigit()):
+                yield extract(entry)
+    elif len(head) > 1:# single object page
+        page=head + [line for line in lines]
+        if any('not found' in line or 'error' in line for line in page):
+            raise SimbadError('could not be resolved by SIMBAD.')
+        query.data=page
+        yield _convert_page_data_to_object(query)
+
 def _convert_page_data_to_object(query):
     obj=SimbadObject()
     obj.load_from_page_data(query.data)
     query.data=obj
     return query()
 
+class SimbadList(list):
+    """
+    List of SimbadObjects merged from several searches. `truncated` lists
+    the criteria of the searches that hit `mx` (empty if it is complete).
+    """
+    truncated = []
+
+def _SearchParts(critstrings, workers, kwargs):
+    # CritSearch of each criteria string in parallel (the transport paces
+    # the requests), as lists of SimbadObjects or SimbadTables
+    if not critstrings:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers,
+        len(critstrings)))) as pool:
+        results=pool.map(lambda critstring: CritSearch(critstring, **kwargs),
+            critstrings)
+        return [ result if isinstance(result, SimbadTable) else list(result)
+            for result in results ]
+
+# narrowest range of right ascension a partition is split into (degrees)
+PARTITION_WIDTH = 1 / 3600
+
+def _PartitionedSearch(critstring, workers, kwargs):
+    # Criteria matching more than `mx` objects are bisected in right
+    # ascension (ANDed onto the criteria) until the COUNT of each part fits,
+    # then the parts are searched in parallel and merged
+    mx=int(kwargs.get('mx', 100))
+    counting=dict(kwargs, mode='COUNT', stream=False, format='ascii')
+    counting.pop('table', None)
+    counting.pop('lazy', None)
+
+    def part(bounds):
+        if bounds is None:
+            return critstring
+        low, high=bounds
+        return '({}) & ra >= {:.9f} & ra {} {:.9f}'.format(critstring, low,
+            '<=' if high >= 360 else '<', high)
+
+    parts, truncated, pending=[], [], [None]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending:
+            counts=pool.map(lambda bounds: int(CritSearch(part(bounds),
+                **counting)), pending)
+            split=[]
+            for bounds, count in zip(pending, counts):
+                if count == 0:
+                    continue
+                low, high=(0.0, 360.0) if bounds is None else bounds
+                if count <= mx:
+                    parts.append(part(bounds))
+                elif high - low <= PARTITION_WIDTH:
+                    parts.append(part(bounds))
+                    truncated.append(part(bounds))
+                else:
+                    middle=(low + high) / 2
+                    split.extend([ (low, middle), (middle, high) ])
+            pending=split
+
+    merged=_MergeResults(_SearchParts(parts, workers, kwargs),
+        _TableResult(kwargs))
+    merged.truncated=truncated
+    return merged
+
+def _TableResult(kwargs):
+    # True if a CritSearch with `kwargs` returns a SimbadTable
+    return bool(kwargs.get('table', False)) or str(kwargs.get('format',
+        'ascii')).lower() == 'votable'
+
+def _MergeResults(results, table=False):
+    # Joins the results of several searches (lists of SimbadObjects or
+    # SimbadTables), keeping the first object of each identifier; with
+    # `table` set a SimbadTable is returned even if there is no result
+    if table and not results:
+        return SimbadTable.from_arrays({}, 0)
+    if results and all(isinstance(result, SimbadTable) for result in results):
+        arrays={ name: np.concatenate([ result.to_numpy([name])[name]
+            for result in results ]) for name in SimbadTable.COLUMNS }
+        first=np.sort(np.unique(arrays['identifier'], return_index=True)[1])
+        return SimbadTable.from_arrays({ name: column[first] for name, column
+            in arrays.items() }, len(first))
+
+    merged, seen=SimbadList(), set()
+    for result in results:
+        for obj in result:
+            if obj.identifier not in seen:
+                seen.add(obj.identifier)
+                merged.append(obj)
+    return merged
+
+#Predicates on the attributes of SimbadObject, compiled to sim-sam criteria
+#where SIMBAD can evaluate them and applied to the result otherwise, e.g.
+#    (Col('Vmag') < 6) & Col('sptype').like('B*') & Region.circle(10, 20, 30)
+#Comparisons bind less tightly than & and | in Python, hence the parentheses.
+
+# criteria field of each attribute (None if SIMBAD cannot search on it)
+CRITERIA_FIELDS = OrderedDict([
+    ('identifier'  , None),
+    ('objecttype'  , 'otype'),
+    ('ra'          , 'ra'),
+    ('dec'         , 'dec'),
+    ('pm_ra'       , 'pmra'),
+    ('pm_dec'      , 'pmdec'),
+    ('plx'         , 'plx'),
+    ('umag'        , 'Umag'),
+    ('bmag'        , 'Bmag'),
+    ('vmag'        , 'Vmag'),
+    ('rmag'        , 'Rmag'),
+    ('imag'        , 'Imag'),
+    ('spectraltype', 'sptype')
+])
+
+# other names accepted by Col (lower case)
+CRITERIA_ALIASES = { 'main_id': 'identifier', 'otype': 'objecttype',
+    'sptype': 'spectraltype', 'pmra': 'pm_ra', 'pmdec': 'pm_dec' }
+
+_OPERATORS = {
+    '<' : np.less,
+    '<=': np.less_equal,
+    '>' : np.greater,
+    '>=': np.greater_equal,
+    '=' : np.equal,
+    '!=': np.not_equal
+}
+
+def _Literal(value):
+    # constant as written in criteria (strings quoted)
+    if isinstance(value, str):
+        if "'" in value:
+            raise SimbadError('Criteria strings cannot contain quotes.')
+        return "'{}'".format(value)
+    return repr(float(value))
+
+def _Distinct(table, attr):
+    # distinct values of the string column `attr` of `table` and the index
+    # of each row in them, so that a test is run once per value
+    column=table[attr]
+    if isinstance(column, Categorical):
+        return np.array(column.categories, dtype=str), column.codes
+    distinct, inverse=np.unique(column.to_numpy().astype(str),
+        return_inverse=True)
+    return distinct, inverse.ravel()
+
+def _Evaluate(table, attr, test):
+    # `test` (on a NumPy array) of the column `attr` of `table`, false
+    # where the value is missing (SIMBAD does not match those)
+    if attr in SimbadTable.FLOATS:
+        column=table[attr]
+        return test(column) & ~np.isnan(column)
+    distinct, inverse=_Distinct(table, attr)
+    return (test(distinct) & (distinct != ''))[inverse]
+
+def _Column(table, attr):
+    # column `attr` of `table` as a NumPy array
+    if attr in SimbadTable.FLOATS:
+        return table[attr]
+    return table[attr].to_numpy().astype(str)
+
+class Predicate:
+    """
+    Condition on the objects of a search, combined with `&`, `|` and `~`.
+    `split()` separates the criteria SIMBAD can evaluate from the rest,
+    `mask(table)` evaluates it on a `SimbadTable`. Each kind of predicate
+    gives the attributes it reads (`columns()`) and evaluates itself on the
+    columns of a table (`_evaluate(table)`).
+    """
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def criteria(self):
+        """
+        The sim-sam criteria string, or None if it cannot be pushed down.
+        """
+        return None
+
+    def split(self):
+        """
+        (criteria, local): the criteria string sent to SIMBAD (or None) and
+        the `Predicate` left to apply to the result (or None).
+        """
+        criteria=self.criteria()
+        return (criteria, None) if criteria is not None else (None, self)
+
+    def mask(self, table):
+        """
+        Boolean NumPy array of the rows of `table` (a SimbadTable, or
+        SimbadObjects) meeting the predicate, evaluated column by column.
+        """
+        if not isinstance(table, SimbadTable):
+            table=SimbadTable.build(table)
+        return np.asarray(self._evaluate(table), dtype=bool)
+
+    def __repr__(self):
+        return str(self)
+
+class Col:
+    """
+    Col( name ):
+
+    Attribute of the objects (see `CRITERIA_FIELDS`, or the criteria names
+    such as 'Vmag' and 'sptype') to build a `Predicate` from.
+    """
+    def __init__(self, name):
+        attr=name.lower()
+        attr=CRITERIA_ALIASES.get(attr, attr)
+        if attr not in CRITERIA_FIELDS:
+            raise SimbadError('`{}` is not a known column, choose from: {}'
+                .format(name, ', '.join(CRITERIA_FIELDS)))
+        self.attr=attr
+
+    def __lt__(self, value):
+        return Compare(self.attr, '<', value)
+
+    def __le__(self, value):
+        return Compare(self.attr, '<=', value)
+
+    def __gt__(self, value):
+        return Compare(self.attr, '>', value)
+
+    def __ge__(self, value):
+        return Compare(self.attr, '>=', value)
+
+    def __eq__(self, value):
+        return Compare(self.attr, '=', value)
+
+    def __ne__(self, value):
+        return Compare(self.attr, '!=', value)
+
+    __hash__ = None
+
+    def like(self, pattern):
+        """
+        Strings matching `pattern`, with the wildcards *, ? and [...].
+        """
+        return Like(self.attr, pattern)
+
+    def isin(self, values):
+        """
+        Values equal to one of `values`.
+        """
+        values=list(values)
+        if not values:
+            raise SimbadError('isin expects at least one value.')
+        predicate=Compare(self.attr, '=', values[0])
+        for value in values[1:]:
+            predicate=predicate | Compare(self.attr, '=', value)
+        return predicate
+
+    def matches(self, pattern):
+        """
+        Strings in which the regular expression `pattern` is found
+        (applied to the result only).
+        """
+        return Matches(self.attr, pattern)
+
+class Compare(Predicate):
+    """
+    Compare( attr, op, value ):
+
+    `attr` compared (op: <, <=, >, >=, =, !=) to a constant or to another
+    `Col` (the latter is applied to the result only).
+    """
+    def __init__(self, attr, op, value):
+        self.attr, self.op, self.value=attr, op, value
+
+    def columns(self):
+        return {self.attr, self.value.attr} if isinstance(self.value,
+            Col) else {self.attr}
+
+    def criteria(self):
+        field=CRITERIA_FIELDS[self.attr]
+        if field is None or isinstance(self.value, Col):
+            return None
+        return '{} {} {}'.format(field, self.op, _Literal(self.value))
+
+    def _evaluate(self, table):
+        compare=_OPERATORS[self.op]
+        if isinstance(self.value, Col):
+            other=self.value.attr
+            return (compare(_Column(table, self.attr), _Column(table, other)) &
+                _Evaluate(table, self.attr, lambda values: True) &
+                _Evaluate(table, other, lambda values: True))
+        return _Evaluate(table, self.attr, lambda values: compare(values,
+            self.value))
+
+    def __str__(self):
+        value=self.value.attr if isinstance(self.value, Col) else _Literal(
+            self.value)
+        return '{} {} {}'.format(self.attr, self.op, value)
+
+class Like(Predicate):
+    """
+    Like( attr, pattern ):
+
+    Strings of `attr` matching the wildcard `pattern`.
+    """
+    def __init__(self, attr, pattern):
+        self.attr, self.pattern=attr, pattern
+
+    def columns(self):
+        return {self.attr}
+
+    def criteria(self):
+        field=CRITERIA_FIELDS[self.attr]
+        if field is None:
+            return None
+        return '{} ~ {}'.format(field, _Literal(self.pattern))
+
+    def _evaluate(self, table):
+        expression=re.compile(fnmatch.translate(self.pattern))
+        return _Evaluate(table, self.attr, lambda values: np.array([
+            expression.match(value) is not None for value in values ],
+            dtype=bool))
+
+    def __str__(self):
+        return '{} ~ {}'.format(self.attr, _Literal(self.pattern))
+
+class Matches(Like):
+    """
+    Matches( attr, pattern ):
+
+    Strings of `attr` in which the regular expression `pattern` is found.
+    Never pushed down.
+    """
+    def criteria(self):
+        return None
+
+    def _evaluate(self, table):
+        expression=re.compile(self.pattern)
+        return _Evaluate(table, self.attr, lambda values: np.array([
+            expression.search(value) is not None for value in values ],
+            dtype=bool))
+
+    def __str__(self):
+        return '{} matches {!r}'.format(self.attr, self.pattern)
+
+class And(Predicate):
+    """
+    Both predicates. The parts SIMBAD can evaluate are pushed down even if
+    the others are not.
+    """
+    def __init__(self, left, right):
+        self.left, self.right=left, right
+
+    def columns(self):
+        return self.left.columns() | self.right.columns()
+
+    def criteria(self):
+        criteria, local=self.split()
+        return criteria if local is None else None
+
+    def split(self):
+        left, left_local=self.left.split()
+        right, right_local=self.right.split()
+
+        if left is None or right is None:
+            criteria=right if left is None else left
+        else:
+            criteria='({}) & ({})'.format(left, right)
+
+        if left_local is None or right_local is None:
+            local=right_local if left_local is None else left_local
+        else:
+            local=And(left_local, right_local)
+        return criteria, local
+
+    def _evaluate(self, table):
+        return self.left._evaluate(table) & self.right._evaluate(table)
+
+    def __str__(self):
+        return '({}) & ({})'.format(self.left, self.right)
+
+class Or(Predicate):
+    """
+    Either predicate. Pushed down only if both are.
+    """
+    def __init__(self, left, right):
+        self.left, self.right=left, right
+
+    def columns(self):
+        return self.left.columns() | self.right.columns()
+
+    def criteria(self):
+        left, right=self.left.criteria(), self.right.criteria()
+        if left is None or right is None:
+            return None
+        return '({}) | ({})'.format(left, right)
+
+    def _evaluate(self, table):
+        return self.left._evaluate(table) | self.right._evaluate(table)
+
+    def __str__(self):
+        return '({}) | ({})'.format(self.left, self.right)
+
+class Not(Predicate):
+    """
+    The negation of a predicate. Pushed down only if it is.
+    """
+    def __init__(self, predicate):
+        self.predicate=predicate
+
+    def columns(self):
+        return self.predicate.columns()
+
+    def criteria(self):
+        criteria=self.predicate.criteria()
+        return None if criteria is None else '!({})'.format(criteria)
+
+    def _evaluate(self, table):
+        return ~self.predicate._evaluate(table)
+
+    def __str__(self):
+        return '!({})'.format(self.predicate)
+
+class Region(Predicate):
+    """
+    Region.circle( lng, lat, rad, radunit='m', frame='icrs' ):
+
+    Objects within `rad` of a position, as in CoordSearch.
+    """
+    def __init__(self, lng, lat, rad, radunit='m', frame='icrs'):
+        if radunit not in ('d','m','s'):
+            raise SimbadError('Unit of radius must be one of d,m,s!')
+        self.lng, self.lat, self.rad=lng, lat, rad
+        self.radunit, self.frame=radunit, frame
+
+    @classmethod
+    def circle(cls, lng, lat, rad, radunit='m', frame='icrs'):
+        return cls(lng, lat, rad, radunit, frame)
+
+    def columns(self):
+        return {'ra', 'dec'}
+
+    def criteria(self):
+        return _CircleCriteria(self.lng, self.lat, self.rad, self.radunit,
+            self.frame)
+
+    def _evaluate(self, table):
+        if self.frame.lower() not in ('icrs', 'fk5'):
+            raise SimbadError('Regions are only applied locally in icrs.')
+        radius=float(self.rad) / {'d': 1.0, 'm': 60.0, 's': 3600.0}[
+            self.radunit]
+        ra, dec=np.radians(table['ra']), np.radians(table['dec'])
+        lng, lat=np.radians(self.lng), np.radians(self.lat)
+        haversine=(np.sin((dec - lat) / 2)**2 +
+            np.cos(dec) * np.cos(lat) * np.sin((ra - lng) / 2)**2)
+        distance=2 * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+        return np.degrees(distance) <= radius
+
+    def __str__(self):
+        return self.criteria()
+
+def Filter(result, predicate):
+    """
+    Filter( result, predicate ):
+
+    The objects of `result` (a SimbadTable or SimbadObjects) meeting
+    `predicate`, evaluated on whole columns.
+    """
+    if isinstance(result, SimbadTable):
+        mask=predicate.mask(result)
+        kept=SimbadTable.from_arrays({ name: column[mask] for name, column
+            in result.to_numpy().items() }, int(np.count_nonzero(mask)))
+        kept.truncated=getattr(result, 'truncated', [])
+        return kept
+
+    objects=list(result)
+    mask=predicate.mask(objects)
+    kept=SimbadList( obj for obj, keep in zip(objects, mask) if keep )
+    kept.truncated=getattr(result, 'truncated', [])
+    return kept
+
+def FilterSearch(predicate, **kwargs):
+    """
+    FilterSearch( predicate, **kwargs ):
+
+    CritSearch (to which kwargs are passed) for the criteria compiled from
+    `predicate`. The parts SIMBAD cannot evaluate (see `Predicate.split`)
+    are applied to the result, whose `local` attribute then holds them.
+    """
+    criteria, local=predicate.split()
+    if criteria is None:
+        raise SimbadError('No part of `{}` can be evaluated by SIMBAD.'
+            .format(predicate))
+    if local is not None and (str(kwargs.get('mode', 'LIST')).upper() ==
+        'COUNT' or kwargs.get('full', False)):
+        raise SimbadError('`{}` must be applied locally, which COUNT and '
+            'full results do not allow.'.format(local))
+
+    if local is None:
+        return CritSearch(criteria, **kwargs)
+
+    # the columns read by the local part must be listed
+    columns=kwargs.get('columns') or _FlagColumns(kwargs.get('get_fluxes',
+        True), kwargs.get('get_pms', False), kwargs.get('get_plx', False),
+        kwargs.get('get_coords', True), kwargs.get('get_spec_type', True))
+    kwargs['columns']=list(columns) + sorted(local.columns() -
+        set(columns))
+
+    result=CritSearch(criteria, **kwargs)
+    result=Filter(result, local)
+    result.local=local
+    return result
+
+#Bulk queries through the TAP service of SIMBAD (ADQL), without the
+#maxObject cap of the criteria interface
+TAP_URL = 'http://simbad.u-strasbg.fr/simbad/sim-tap'
+
+# result formats of TAPQuery and the FORMAT requested for them
+TAP_FORMATS = {
+    'votable' : 'votable',
+    'binary2' : 'votable/b2',
+    'csv'     : 'csv'
+}
+
+# QUERY_STATUS of a TAP answer (INFO elements, before or after the table)
+TAP_STATUS = re.compile(rb'<INFO(?=[^>]*name="QUERY_STATUS")[^>]*'
+    rb'value="(\w+)"[^>]*?(?:/>|>([^<]*)<)')
+
+def _TAPStatus(body):
+    """
+    (error, overflow) of the TAP answer `body` (bytes): the message of a
+    QUERY_STATUS of ERROR (None if there is none), and True if the result
+    was cut at MAXREC (OVERFLOW).
+    """
+    error, overflow = None, False
+    for status in TAP_STATUS.finditer(body):
+        value = status.group(1).upper()
+        if value == b'ERROR':
+            error = (status.group(2) or b'').decode('utf-8', 'replace').strip()
+        overflow = overflow or value == b'OVERFLOW'
+    return error, overflow
+
+def _DecodeTAP(body, format):
+    """
+    (columns, overflow) of a TAP result `body` (bytes): the columns (name
+    -> NumPy array, missing numbers as NaN and missing strings as '') and
+    True if the service reports the result cut at MAXREC (VOTable only).
+    """
+    columns = OrderedDict()
+    payload = Payload(body, parse=False)
+    if format == 'csv' and not body.startswith(b'<', payload.start):
+        rows    = csv.reader(payload.text(whole=True).splitlines())
+        names   = next(rows, [])
+        values  = list(zip(*rows)) or [ () for name in names ]
+        for name, column in zip(names, values):
+            column = np.array(column, dtype=str)
+            try:
+                column = np.where(column == '', 'nan', column).astype(
+                    np.float64)
+            except ValueError:
+                pass
+            columns[name] = column
+        return columns, False
+
+    # errors come back as a VOTable without rows, whatever the format
+    error, overflow = _TAPStatus(body)
+    if error is not None:
+        raise SimbadError('TAP query failed: {}'.format(error))
+    if format == 'csv':
+        raise SimbadError('TAP service answered a VOTable instead of CSV.')
+
+    try:
+        array = parse_votable(BytesIO(body), verify='ignore'
+            ).get_first_table().array
+    except (ValueError, IndexError) as error:
+        raise SimbadError('Failed to decode the TAP result: {}'.format(error))
+    for name in array.dtype.names:
+        column = array[name]
+        data   = np.ma.getdata(column)
+        mask   = np.ma.getmaskarray(column)
+        if data.dtype.kind in 'fiu' and (data.dtype.kind == 'f' or
+            mask.any()):
+            column = np.where(mask, np.nan, data.astype(np.float64))
+        elif data.dtype.kind in 'SUO':
+            if data.dtype.kind == 'S':
+                data = np.char.decode(data, 'utf-8')
+            column = np.where(mask, '', data.astype(str))
+        else:
+            column = np.array(data)
+        columns[name] = column
+    return columns, overflow
+
+class TAPQuery:
+    """
+    TAPQuery( adql, **kwargs ):
+
+    Query the TAP service of SIMBAD (or any TAP service at `url`, such as a
+    local stand-in) in ADQL. The 'sync' mode answers in one request; the
+    'async' mode runs a job, polled until it completes, for long queries.
+    With `page` set, the query is sent `page` rows at a time (with OFFSET,
+    so it should have an ORDER BY) and the pages are joined. The result
+    is decoded into NumPy columns, `query[name]`. `overflow` is True if the
+    service cut the result at `maxrec` or its own limit (pages it cuts
+    short are followed by the next one instead).
+
+    kwargs = {
+        'url'     : TAP_URL,   # TAP service
+        'mode'    : 'sync',    # or 'async'
+        'format'  : 'votable', # 'votable', 'binary2' or 'csv'
+        'maxrec'  : 0,         # rows at most (0 for the service limit)
+        'page'    : 0,         # rows per request (0 for all at once)
+        'poll'    : 0.5,       # first delay between job polls (s)
+        'wait'    : 3600.0,    # seconds allowed for a job
+        'cache'   : True,      # use the transport's cache (sync mode)
+        'deadline': 0.0        # seconds allowed (0 for none)
+    }
+    """
+    def __init__(self, adql, **kwargs):
+        """
+        Send the query and decode the result.
+        """
+        if type(adql) is not str:
+            raise SimbadError('Simbad.TAPQuery expects a str ADQL query.')
+
+        # not an `Options` keyword
+        self.transport = GetTransport( kwargs.pop('transport', None) )
+
+        try:
+            # keyword argument options for TAPQuery
+            self.options = Options( kwargs,
+                {
+                    'url'     : TAP_URL,
+                    'mode'    : 'sync',
+                    'format'  : 'votable',
+                    'maxrec'  : 0,
+                    'page'    : 0,
+                    'poll'    : 0.5,
+                    'wait'    : 3600.0,
+                    'cache'   : True,
+                    'deadline': 0.0
+                })
+
+            # assignments
+            self.url      = self.options('url').rstrip('/')
+            self.mode     = self.options('mode').lower()
+            self.format   = self.options('format').lower()
+            self.maxrec   = self.options('maxrec')
+            self.page     = self.options('page')
+            self.poll     = self.options('poll')
+            self.wait     = self.options('wait')
+            self.cache    = self.options('cache')
+            self.deadline = Deadline(self.options('deadline'))
+
+        except OptionsError as err:
+            print('\n --> OptionsError:', err.msg )
+            raise SimbadError('Simbad.TAPQuery was not constructed')
+
+        if self.mode not in ('sync', 'async'):
+            raise SimbadError('TAP mode must be sync or async!')
+        if self.format not in TAP_FORMATS:
+            raise SimbadError('TAP format must be one of {}!'.format(
+                ', '.join(sorted(TAP_FORMATS))))
+
+        self.adql = adql
+        try:
+            if not self.page:
+                self.columns, self.overflow = self.__run(adql, self.maxrec)
+            else:
+                self.columns = self.__paged(adql)
+
+        except HTTPError as error:
+            raise SimbadError('TAP query failed with HTTP status {}'
+                .format(error.code))
+
+        except URLError as error:
+            raise SimbadError('Failed to contact TAP service at `{}`'
+                .format(self.url))
+
+    def __paged(self, adql):
+        """
+        Send `adql` one page at a time and join the pages.
+        """
+        pages, offset = [], 0
+        self.overflow = False
+        while True:
+            size = self.page
+            if self.maxrec:
+                size = min(size, self.maxrec - offset)
+            if size <= 0:
+                break
+
+            page, self.overflow = self.__run('{} OFFSET {}'.format(adql,
+                offset), size)
+            pages.append(page)
+            rows = len(next(iter(page.values()))) if page else 0
+            offset += rows
+            # a page cut short by the service's own limit is not the end
+            if rows == 0 or (rows < size and not self.overflow):
+                break
+
+        columns = OrderedDict()
+        for name in (pages[0] if pages else ()):
+            columns[name] = np.concatenate([ page[name] for page in pages ])
+        return columns
+
+    def __run(self, adql, maxrec):
+        """
+        (columns, overflow) of the result of `adql` (at most `maxrec` rows
+        if not 0), see `_DecodeTAP`.
+        """
+        params = OrderedDict([ ('REQUEST', 'doQuery'), ('LANG', 'ADQL'),
+            ('FORMAT', TAP_FORMATS[self.format]), ('QUERY', adql) ])
+        if maxrec:
+            params['MAXREC'] = str(int(maxrec))
+
+        if self.mode == 'sync':
+            response = self.transport.request(self.url + '/sync',
+                urlencode(params).encode('utf-8'), cache=self.cache,
+                deadline=self.deadline)
+            self.stale = getattr(response, 'stale', False)
+            return _DecodeTAP(response.read(), self.format)
+
+        # create and start a job; the service redirects to it. Requests
+        # changing the job are sent exactly once (see Transport.submit)
+        params['PHASE'] = 'RUN'
+        response = self.transport.submit(self.url + '/async',
+            urlencode(params).encode('utf-8'), deadline=self.deadline)
+        job = response.url.rstrip('/')
+        if job == self.url + '/async':
+            # not redirected: the job is described in the response
+            job_id = re.search(rb'<(?:uws:)?jobId>([^<]+)<', response.read())
+            if job_id is None:
+                raise SimbadError('TAP service did not create a job.')
+            job += '/' + job_id.group(1).decode('utf-8').strip()
+
+        try:
+            phase = self.__await(job)
+            if phase != 'COMPLETED':
+                error = self.transport.request(job + '/error', cache=False,
+                    deadline=self.deadline).read()
+                raise SimbadError('TAP job {} ended {}: {}'.format(job, phase,
+                    error.decode('utf-8', 'replace').strip()[:500]))
+
+            response = self.transport.request(job + '/results/result',
+                cache=False, deadline=self.deadline)
+            self.stale = False
+            return _DecodeTAP(response.read(), self.format)
+
+        finally:
+            try:
+                self.transport.submit(job, b'ACTION=DELETE')
+            except URLError:
+                # the service removes it after its destruction time
+                pass
+
+    def __await(self, job):
+        """
+        Poll `job` until it has finished and return its phase.
+        """
+        delay = self.poll
+        limit = time.monotonic() + self.wait
+        if self.deadline is not None:
+            limit = min(limit, self.deadline)
+
+        while True:
+            phase = self.transport.request(job + '/phase', cache=False,
+                deadline=self.deadline).read().decode('utf-8').strip()
+            if phase in ('COMPLETED', 'ERROR', 'ABORTED'):
+                return phase
+            if phase == 'PENDING':
+                self.transport.submit(job + '/phase', b'PHASE=RUN',
+                    deadline=self.deadline)
+
+            if time.monotonic() + delay > limit:
+                raise SimbadError('TAP job {} still {} after {} seconds'
+                    .format(job, phase, self.wait))
+            time.sleep(delay)
+            delay = min(2 * delay, 30.0)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __call__(self):
+        """
+        Retrieve data from Query
+        """
+        return self.columns
+
+# ADQL for the columns of a SimbadTable, by attribute name
+TAP_COLUMNS = OrderedDict([
+    ('identifier'  , 'basic.main_id'),
+    ('objecttype'  , 'basic.otype'),
+    ('ra'          , 'basic.ra'),
+    ('dec'         , 'basic.dec'),
+    ('pm_ra'       , 'basic.pmra'),
+    ('pm_dec'      , 'basic.pmdec'),
+    ('plx'         , 'basic.plx_value'),
+    ('umag'        , 'allfluxes.U'),
+    ('bmag'        , 'allfluxes.B'),
+    ('vmag'        , 'allfluxes.V'),
+    ('rmag'        , 'allfluxes.R'),
+    ('imag'        , 'allfluxes.I'),
+    ('spectraltype', 'basic.sp_type')
+])
+
+def TAPRegion(lng, lat, rad, radunit='m', frame='ICRS'):
+    """
+    ADQL condition for objects within `rad` (in 'd', 'm' or 's') of the
+    position (`lng`, `lat`) in degrees.
+    """
+    if radunit not in ('d','m','s'):
+        raise SimbadError('Unit of radius must be one of d,m,s!')
+    rad = float(rad) / {'d': 1.0, 'm': 60.0, 's': 3600.0}[radunit]
+    return ("CONTAINS(POINT('{0}', basic.ra, basic.dec), "
+        "CIRCLE('{0}', {1}, {2}, {3})) = 1".format(frame.upper(), float(lng),
+        float(lat), rad))
+
+def TAPScript(condition, columns=None, order=True):
+    """
+    ADQL selecting `columns` (see `SelectColumns`, all by default) of the
+    objects meeting the ADQL `condition`, ordered by `basic.oid` so that
+    it can be paged.
+    """
+    selected = SelectColumns(TAP_COLUMNS if columns is None else columns)
+    fields   = ', '.join( '{} AS {}'.format(expression, attr) for attr,
+        expression in TAP_COLUMNS.items() if attr in selected )
+    tables   = 'basic'
+    if any( TAP_COLUMNS[attr].startswith('allfluxes') for attr in selected ):
+        tables += ' LEFT OUTER JOIN allfluxes ON basic.oid = allfluxes.oidref'
+
+    return 'SELECT {} FROM {} WHERE {}{}'.format(fields, tables, condition,
+        ' ORDER BY basic.oid' if order else '')
+
+def TAPSearch(condition, columns=None, **kwargs):
+    """
+    TAPSearch( condition, columns=None, **kwargs ):
+
+    `SimbadTable` of the objects meeting the ADQL `condition` (e.g.,
+    "basic.dec > 80" or a `TAPRegion`), through `TAPQuery` (to which
+    kwargs are passed). There is no cap on the number of rows beyond
+    `maxrec` and the limits of the service.
+    """
+    query = TAPQuery(TAPScript(condition, columns), **kwargs)
+    return SimbadTable.from_arrays({ name: column for name, column
+        in query.columns.items() if name in SimbadTable.COLUMNS }, len(query))
+
+#Awaitable counterparts of the queries above, for use from asyncio.
+#Each runs the synchronous function on the shared executor of
+#Framework.Async, so parsing and results are the same on both paths.
+async def aposition(identifier, **kwargs):
+    """
+    Awaitable `Position`.
+    """
+    return await Run(Position, identifier, **kwargs)
+
+async def adistance(identifier, **kwargs):
+    """
+    Awaitable `Distance`.
+    """
+    return await Run(Distance, identifier, **kwargs)
+
+async def asptype(identifier, **kwargs):
+    """
+    Awaitable `SpType`.
+    """
+    return await Run(SpType, identifier, **kwargs)
+
+async def aidlist(identifier, **kwargs):
+    """
+    Awaitable `IDList`.
+    """
+    return await Run(IDList, identifier, **kwargs)
+
+async def abvfluxes(identifier, **kwargs):
+    """
+    Awaitable `BVFluxes`.
+    """
+    return await Run(BVFluxes, identifier, **kwargs)
+
+async def aobjtype(identifier, **kwargs):
+    """
+    Awaitable `ObjType`.
+    """
+    return await Run(ObjType, identifier, **kwargs)
+
+async def arecord(identifier, fields=None, **kwargs):
+    """
+    Awaitable `Record`.
+    """
+    return await Run(Record, identifier, fields, **kwargs)
+
+async def acrit_search(critstring, **kwargs):
+    """
+    Awaitable `CritSearch`. With `stream` set, an async iterator of the
+    objects (or lines) is returned.
+    """
+    return await Run(CritSearch, critstring, **kwargs)
+
+async def acoord_search(lng, lat, rad, **kwargs):
+    """
+    Awaitable `CoordSearch`. With `stream` set, an async iterator of the
+    objects (or lines) is returned.
+    """
+    return await Run(CoordSearch, lng, lat, rad, **kwargs)
+
+async def atap_query(adql, **kwargs):
+    """
+    Awaitable `TAPQuery`.
+    """
+    return await Run(TAPQuery, adql, **kwargs)
+
+async def atap_search(condition, columns=None, **kwargs):
+    """
+    Awaitable `TAPSearch`.
+    """
+    return await Run(TAPSearch, condition, columns, **kwargs)
+
 def Main( clargs ):
     """
     Main function. See __doc__ for details.
@@ -654,7 +2923,8 @@ def Main( clargs ):
             'Distance' : Distance, # search for parsecs
             'Position' : Position, # search for ra, dec
             'Sptype'   : Sptype  , # search for spectral types
-            'IDList'   : IDList    # search for IDs
+            'IDList'   : IDList  , # search for IDs
+            'Record'   : Record    # search for all of the above
         }
 
 